@@ -9,7 +9,8 @@ import sys
 import os
 import time
 import logging
-from typing import Dict, Any
+import importlib
+from typing import Dict, Any, Optional
 
 # 确保项目根目录在Python路径中
 PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
@@ -23,6 +24,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 模块探测失败结果缓存 {模块名: ImportError}，同一进程内重复探测时直接返回
+_import_failures: Dict[str, ImportError] = {}
+
+def _probe_module(module_name: str) -> Optional[ImportError]:
+    """探测模块是否可导入
+
+    已导入的模块直接命中 sys.modules，跳过完整的导入查找流程；
+    导入失败的结果按模块名缓存。
+
+    Returns:
+        Optional[ImportError]: 导入成功返回 None，否则返回导入错误
+    """
+    if module_name in sys.modules:
+        return None
+    if module_name in _import_failures:
+        return _import_failures[module_name]
+    try:
+        importlib.import_module(module_name)
+        return None
+    except ImportError as e:
+        _import_failures[module_name] = e
+        return e
+
 def print_banner():
     """打印横幅"""
     print("=" * 60)
@@ -39,8 +63,66 @@ def print_banner():
     print("√ 内置性能监控和错误处理")
     print("=" * 60)
 
-def check_system_compatibility() -> Dict[str, Any]:
-    """检查系统兼容性"""
+def _check_python_version(results: Dict[str, Any]) -> None:
+    """检查Python版本（开销很小，无需导入任何模块）"""
+    if sys.version_info < (3, 7):
+        results['compatible'] = False
+        results['issues'].append("Python版本过低，需要3.7+")
+    else:
+        print(f"√ Python版本: {sys.version.split()[0]}")
+
+def _check_modules(results: Dict[str, Any]) -> None:
+    """探测必要模块、增强模块和可选依赖（会导入应用，开销较大）"""
+    # 检查必要的模块
+    required_modules = [
+        'src.app.main',
+        'src.app.chat.handler',
+        'src.app.products.manager'
+    ]
+
+    for module in required_modules:
+        if _probe_module(module) is None:
+            print(f"√ 模块可用: {module}")
+        else:
+            results['compatible'] = False
+            results['issues'].append(f"缺少必要模块: {module}")
+
+    # 检查增强功能模块
+    enhancement_modules = [
+        'src.core.enhanced_chat_router',
+        'src.core.deep_context_engine',
+        'src.app.personalization.learning_engine'
+    ]
+
+    for module in enhancement_modules:
+        if _probe_module(module) is None:
+            print(f"√ 增强模块: {module}")
+        else:
+            results['warnings'].append(f"增强模块不可用: {module}")
+
+    # 检查现有ChatHandler
+    try:
+        from src.app.main import chat_handler
+        if chat_handler:
+            print("√ 现有ChatHandler可访问")
+        else:
+            results['warnings'].append("ChatHandler为None，可能影响集成")
+    except Exception as e:
+        results['warnings'].append(f"无法访问ChatHandler: {e}")
+
+    # 检查可选依赖
+    optional_deps = ['numpy', 'jieba']
+    for dep in optional_deps:
+        if _probe_module(dep) is None:
+            print(f"√ 可选依赖: {dep}")
+        else:
+            results['warnings'].append(f"可选依赖缺失: {dep} (不影响基础功能)")
+
+def check_system_compatibility(probe_modules: bool = True) -> Dict[str, Any]:
+    """检查系统兼容性
+
+    probe_modules 为 False 时只做廉价检查，模块探测留到用户确认集成之后再进行。
+    """
     print("\n>> 正在检查系统兼容性...")
     
     results = {
@@ -51,67 +133,31 @@ def check_system_compatibility() -> Dict[str, Any]:
     }
     
     try:
-        # 检查Python版本
-        if sys.version_info < (3, 7):
-            results['compatible'] = False
-            results['issues'].append("Python版本过低，需要3.7+")
-        else:
-            print(f"√ Python版本: {sys.version.split()[0]}")
-
-        # 检查必要的模块
-        required_modules = [
-            'src.app.main',
-            'src.app.chat.handler',
-            'src.app.products.manager'
-        ]
-
-        for module in required_modules:
-            try:
-                __import__(module)
-                print(f"√ 模块可用: {module}")
-            except ImportError as e:
-                results['compatible'] = False
-                results['issues'].append(f"缺少必要模块: {module}")
-
-        # 检查增强功能模块
-        enhancement_modules = [
-            'src.core.enhanced_chat_router',
-            'src.core.deep_context_engine',
-            'src.app.personalization.learning_engine'
-        ]
-
-        for module in enhancement_modules:
-            try:
-                __import__(module)
-                print(f"√ 增强模块: {module}")
-            except ImportError as e:
-                results['warnings'].append(f"增强模块不可用: {module}")
-
-        # 检查现有ChatHandler
-        try:
-            from src.app.main import chat_handler
-            if chat_handler:
-                print("√ 现有ChatHandler可访问")
-            else:
-                results['warnings'].append("ChatHandler为None，可能影响集成")
-        except Exception as e:
-            results['warnings'].append(f"无法访问ChatHandler: {e}")
-
-        # 检查可选依赖
-        optional_deps = ['numpy', 'jieba']
-        for dep in optional_deps:
-            try:
-                __import__(dep)
-                print(f"√ 可选依赖: {dep}")
-            except ImportError:
-                results['warnings'].append(f"可选依赖缺失: {dep} (不影响基础功能)")
-        
+        _check_python_version(results)
+        if probe_modules:
+            _check_modules(results)
     except Exception as e:
         results['compatible'] = False
         results['issues'].append(f"兼容性检查失败: {e}")
     
     return results
 
+def _report_compatibility(results: Dict[str, Any]) -> bool:
+    """打印兼容性检查结果，返回是否可以继续"""
+    if not results['compatible']:
+        print("\n❌ 系统兼容性检查失败：")
+        for issue in results['issues']:
+            print(f"  • {issue}")
+        print("\n请解决上述问题后重试。")
+        return False
+    
+    if results['warnings']:
+        print("\n!! 发现以下警告：")
+        for warning in results['warnings']:
+            print(f"  • {warning}")
+        print("\n这些警告不会阻止集成，但可能影响某些功能。")
+    return True
+
 def perform_integration(config: Dict[str, Any]) -> bool:
     """执行集成"""
     print("\n>> 正在集成增强功能...")
@@ -270,25 +316,11 @@ def main():
     """主函数"""
     print_banner()
     
-    # 兼容性检查
-    compat_results = check_system_compatibility()
-    
-    if not compat_results['compatible']:
-        print("\n❌ 系统兼容性检查失败：")
-        for issue in compat_results['issues']:
-            print(f"  • {issue}")
-        print("\n请解决上述问题后重试。")
+    # 先做廉价的兼容性检查，导入应用模块的探测留到用户确认之后
+    compat_results = check_system_compatibility(probe_modules=False)
+    if not _report_compatibility(compat_results):
         return False
-    
-    if compat_results['warnings']:
-        print("\n!! 发现以下警告：")
-        for warning in compat_results['warnings']:
-            print(f"  • {warning}")
-        print("\n这些警告不会阻止集成，但可能影响某些功能。")
 
-    # 询问用户是否继续
-    print(f"\n√ 系统兼容性检查通过")
-    
     try:
         user_input = input("\n是否继续集成增强功能？(y/N): ").strip().lower()
         if user_input not in ['y', 'yes', '是']:
@@ -297,6 +329,17 @@ def main():
     except KeyboardInterrupt:
         print("\n集成已取消。")
         return False
+
+    # 用户确认后再探测模块
+    print("\n>> 正在检查模块可用性...")
+    try:
+        _check_modules(compat_results)
+    except Exception as e:
+        compat_results['compatible'] = False
+        compat_results['issues'].append(f"兼容性检查失败: {e}")
+    if not _report_compatibility(compat_results):
+        return False
+    print(f"\n√ 系统兼容性检查通过")
     
     # 配置选项
     config = {
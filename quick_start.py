@@ -4,12 +4,31 @@ Chat AI 快速启动和导航脚本
 帮助用户快速了解项目结构和启动应用
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
 import webbrowser
 from pathlib import Path
 
+# 在单个解释器中依次运行测试脚本（脚本路径通过命令行参数传入），失败的脚本不影响后续脚本
+TEST_RUNNER_CODE = """
+import runpy
+import sys
+import traceback
+
+for script in sys.argv[1:]:
+    print(f"运行测试: {script}")
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"❌ 测试失败: {script}")
+    except Exception:
+        traceback.print_exc()
+        print(f"❌ 测试失败: {script}")
+"""
+
 def print_banner():
     """打印欢迎横幅"""
     print("=" * 60)
@@ -17,27 +36,31 @@ def print_banner():
     print("=" * 60)
     print()
 
+def is_module_installed(module_name):
+    """检查模块是否已安装（只查找模块，不执行其导入时的初始化代码）"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
 def check_dependencies():
     """检查依赖是否已安装"""
     print("🔍 检查依赖...")
     
-    try:
-        import flask
+    if is_module_installed('flask'):
         print("✅ Flask 已安装")
-    except ImportError:
+    else:
         print("❌ Flask 未安装")
         return False
     
-    try:
-        import redis
+    if is_module_installed('redis'):
         print("✅ Redis 库已安装")
-    except ImportError:
+    else:
         print("⚠️ Redis 库未安装（可选）")
     
-    try:
-        import psutil
+    if is_module_installed('psutil'):
         print("✅ psutil 已安装")
-    except ImportError:
+    else:
         print("⚠️ psutil 未安装（可选）")
     
     return True
@@ -130,7 +153,8 @@ def install_dependencies():
     if os.path.exists(requirements_file):
         print(f"正在安装 {requirements_file}...")
         try:
-            subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_file], check=True)
+            subprocess.run([sys.executable, "-m", "pip", "install", "--prefer-binary", "--no-compile",
+                            "-r", requirements_file], check=True)
             print("✅ 依赖安装成功")
         except subprocess.CalledProcessError:
             print("❌ 依赖安装失败")
@@ -176,15 +200,16 @@ def run_tests():
             "scripts/testing/test_redis_monitoring.py"
         ]
         
+        existing_scripts = []
         for script in test_scripts:
             if os.path.exists(script):
-                print(f"运行测试: {script}")
-                try:
-                    subprocess.run([sys.executable, script], check=True)
-                except subprocess.CalledProcessError:
-                    print(f"❌ 测试失败: {script}")
+                existing_scripts.append(script)
             else:
                 print(f"⚠️ 测试文件不存在: {script}")
+        
+        if existing_scripts:
+            # 所有测试脚本在同一个子进程中依次运行，只启动一次解释器
+            subprocess.run([sys.executable, "-c", TEST_RUNNER_CODE, *existing_scripts])
 
 def main():
     """主函数"""
@@ -5,11 +5,14 @@ Render部署修复脚本
 """
 
 import os
+import re
 import sys
 import subprocess
-import yaml
 from pathlib import Path
 
+# envVars 中的 "- key: XXX" / "value: YYY" 配置对（值去掉引号和行尾注释）
+_ENV_VAR_RE = re.compile(r'^\s*-\s*key:\s*(\S+)\s*\n\s*value:\s*["\']?([^\s"\'#]*)', re.MULTILINE)
+
 def print_status(message, status="INFO"):
     """打印状态信息"""
     colors = {
@@ -22,32 +25,32 @@ def print_status(message, status="INFO"):
     print(f"{colors.get(status, '')}{status}: {message}{colors['RESET']}")
 
 def check_render_yaml():
-    """检查render.yaml配置"""
+    """检查render.yaml配置
+
+    Returns:
+        tuple: (检查是否通过, 文件内容；读取失败时为None)
+    """
     print_status("检查render.yaml配置...")
     
     render_yaml_path = Path("render.yaml")
     if not render_yaml_path.exists():
         print_status("render.yaml文件不存在", "ERROR")
-        return False
+        return False, None
     
+    content = None
     try:
         with open(render_yaml_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            content = f.read()
         
-        # 检查环境变量
-        env_vars = {}
-        if 'services' in config and len(config['services']) > 0:
-            service = config['services'][0]
-            if 'envVars' in service:
-                for var in service['envVars']:
-                    env_vars[var['key']] = var['value']
+        # 检查环境变量（只需读取少数几个键，直接用正则提取，无需完整解析YAML）
+        env_vars = dict(_ENV_VAR_RE.findall(content))
         
         # 检查Redis配置
         redis_enabled = env_vars.get('REDIS_ENABLED', 'true').lower()
         if redis_enabled == 'true':
             print_status("发现Redis已启用，但Render环境可能没有Redis服务", "WARNING")
             print_status("建议禁用Redis使用内存缓存", "WARNING")
-            return False
+            return False, content
         else:
             print_status("Redis已正确禁用", "SUCCESS")
         
@@ -57,24 +60,29 @@ def check_render_yaml():
             print_status(f"模型类型为{model_type}，建议使用lightweight", "WARNING")
         
         print_status("render.yaml配置检查完成", "SUCCESS")
-        return True
+        return True, content
         
     except Exception as e:
         print_status(f"读取render.yaml失败: {e}", "ERROR")
-        return False
+        return False, content
+
+def fix_render_yaml(content=None):
+    """修复render.yaml配置
 
-def fix_render_yaml():
-    """修复render.yaml配置"""
+    Args:
+        content: 检查时已读取的文件内容，为None时重新读取
+    """
     print_status("修复render.yaml配置...")
     
     render_yaml_path = Path("render.yaml")
-    if not render_yaml_path.exists():
+    if content is None and not render_yaml_path.exists():
         print_status("render.yaml文件不存在，无法修复", "ERROR")
         return False
     
     try:
-        with open(render_yaml_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if content is None:
+            with open(render_yaml_path, 'r', encoding='utf-8') as f:
+                content = f.read()
         
         # 检查是否已有REDIS_ENABLED配置
         if 'REDIS_ENABLED' not in content:
@@ -162,13 +170,14 @@ def main():
     print_status("=" * 50)
     
     # 检查当前配置
-    if check_render_yaml():
+    config_ok, content = check_render_yaml()
+    if config_ok:
         print_status("配置检查通过，无需修复", "SUCCESS")
     else:
         print_status("需要修复配置", "WARNING")
         
-        # 修复配置
-        if not fix_render_yaml():
+        # 修复配置（复用检查时读取的内容）
+        if not fix_render_yaml(content):
             print_status("配置修复失败", "ERROR")
             sys.exit(1)
     
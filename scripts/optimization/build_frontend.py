@@ -4,48 +4,67 @@
 自动化执行所有优化步骤
 """
 
-import subprocess
+import importlib.util
+import io
 import sys
 import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
-def run_script(script_path, description):
-    """运行优化脚本"""
+def run_step(script_path):
+    """在调用方所在的进程中加载优化脚本并调用其 main()，捕获输出
+
+    并行执行的步骤（CSS/JS/图片）由进程池提交，调用方即池中的工作进程；其余步骤在主进程中执行。
+    脚本不经由 subprocess 启动新的解释器，省去重复启动和重复导入依赖的开销。
+
+    Returns:
+        tuple: (是否成功, 标准输出, 错误输出, 耗时秒数)
+    """
+    start_time = time.time()
+    stdout, stderr = io.StringIO(), io.StringIO()
+    
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            module_name = Path(script_path).stem
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            # 注册到 sys.modules，脚本内部的进程池才能按模块名序列化其函数
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            success = bool(module.main())
+    except Exception:
+        traceback.print_exc(file=stderr)
+        success = False
+    
+    return success, stdout.getvalue(), stderr.getvalue(), time.time() - start_time
+
+def report_step(script_path, description, result):
+    """输出优化步骤的运行结果"""
     print(f"\n{'='*50}")
     print(f"运行: {description}")
     print(f"{'='*50}")
     
-    start_time = time.time()
+    success, stdout, stderr, elapsed_time = result
     
-    try:
-        result = subprocess.run(
-            [sys.executable, script_path], 
-            capture_output=True, 
-            text=True,
-            cwd=Path.cwd()
-        )
-        
-        elapsed_time = time.time() - start_time
-        
-        if result.returncode == 0:
-            print(result.stdout)
-            print(f"成功: {description} 完成 (耗时: {elapsed_time:.2f}秒)")
-            return True
-        else:
-            print(f"失败: {description} 失败")
-            print("错误输出:")
-            print(result.stderr)
-            if result.stdout:
-                print("标准输出:")
-                print(result.stdout)
-            return False
-            
-    except Exception as e:
-        elapsed_time = time.time() - start_time
-        print(f"异常: 运行 {script_path} 时发生异常: {e}")
-        print(f"耗时: {elapsed_time:.2f}秒")
+    if success:
+        print(stdout)
+        print(f"成功: {description} 完成 (耗时: {elapsed_time:.2f}秒)")
+        return True
+    else:
+        print(f"失败: {description} 失败")
+        print("错误输出:")
+        print(stderr)
+        if stdout:
+            print("标准输出:")
+            print(stdout)
         return False
 
+def run_script(script_path, description):
+    """运行优化脚本"""
+    return report_step(script_path, description, run_step(script_path))
+
 def check_dependencies():
     """检查依赖"""
     print("检查依赖...")
@@ -87,14 +106,36 @@ def run_optimization():
     success_count = 0
     total_steps = len(optimization_steps)
     
-    for script_path, description in optimization_steps:
-        if Path(script_path).exists():
-            if run_script(script_path, description):
+    # CSS/JS/图片优化处理互不相交的文件，同时启动；资源清单依赖它们的输出，最后单独执行
+    *parallel_steps, manifest_step = optimization_steps
+    
+    # 各步骤在独立的工作进程中调用脚本的 main()，互不干扰彼此的输出和全局状态
+    running = []
+    with ProcessPoolExecutor(max_workers=max(1, len(parallel_steps))) as executor:
+        for script_path, description in parallel_steps:
+            if Path(script_path).exists():
+                running.append((executor.submit(run_step, script_path), script_path, description))
+            else:
+                print(f"错误: 脚本文件不存在: {script_path}")
+        
+        for future, script_path, description in running:
+            try:
+                result = future.result()
+            except Exception as e:
+                result = (False, '', f"运行 {script_path} 时发生异常: {e}", 0.0)
+            if report_step(script_path, description, result):
                 success_count += 1
             else:
                 print(f"警告: {description} 失败，但继续执行其他步骤...")
+    
+    script_path, description = manifest_step
+    if Path(script_path).exists():
+        if run_script(script_path, description):
+            success_count += 1
         else:
-            print(f"错误: 脚本文件不存在: {script_path}")
+            print(f"警告: {description} 失败，但继续执行其他步骤...")
+    else:
+        print(f"错误: 脚本文件不存在: {script_path}")
 
     # 总结
     print(f"\n{'='*60}")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+前端优化脚本共用的工具函数
+"""
+
+import os
+from pathlib import Path
+
+def is_up_to_date(source_path, *output_paths):
+    """所有输出文件都存在且不早于源文件时视为最新，增量构建时可跳过"""
+    try:
+        source_mtime = os.stat(source_path).st_mtime
+        return all(os.stat(path).st_mtime >= source_mtime for path in output_paths)
+    except OSError:
+        return False
+
+def iter_files(directory, extensions, ignore_case=False):
+    """递归遍历目录，返回指定扩展名的文件（ignore_case 为真时扩展名不区分大小写）
+
+    顺序与 Path.glob('**/*ext') 一致：先列出当前目录的文件，再依次深入子目录（不跟随符号链接目录）。
+    使用 os.scandir，文件类型取自目录项本身，避免为每个路径单独 stat。
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        name = entry.name.lower() if ignore_case else entry.name
+        if name.endswith(extensions) and entry.is_file():
+            yield Path(entry.path)
+    
+    for entry in entries:
+        if entry.is_dir() and not entry.is_symlink():
+            yield from iter_files(entry.path, extensions, ignore_case)
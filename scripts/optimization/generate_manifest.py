@@ -7,49 +7,102 @@
 import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+
+# 可选：orjson 的C实现序列化大清单更快，未安装时使用标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1 << 20
+
+def _new_file_hasher():
+    """创建文件哈希对象：哈希仅用于缓存破坏，使用比MD5更快的BLAKE2b，4字节摘要即8位十六进制"""
+    return hashlib.blake2b(digest_size=4)
 
 def generate_file_hash(file_path):
     """生成文件哈希"""
     try:
+        # 分块流式计算哈希，内存占用与文件大小无关
         with open(file_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()[:8]
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, _new_file_hasher).hexdigest()
+            file_hash = _new_file_hasher()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+            return file_hash.hexdigest()
     except Exception as e:
         print(f"生成哈希失败 {file_path}: {e}")
         return "00000000"
 
 def get_file_info(file_path):
-    """获取文件信息"""
+    """获取文件信息
+
+    Args:
+        file_path: Path 或 os.DirEntry；DirEntry 会复用扫描目录时缓存的 stat 结果
+    """
     try:
         stat = file_path.stat()
         return {
             'size': stat.st_size,
             'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            'type': get_file_type(file_path.suffix)
+            'type': get_file_type(Path(file_path).suffix)
         }
     except Exception as e:
         print(f"获取文件信息失败 {file_path}: {e}")
         return {'size': 0, 'modified': '', 'type': 'unknown'}
 
+# 扩展名（小写）到文件类型的映射
+_FILE_TYPE_MAP = {
+    '.css': 'stylesheet',
+    '.js': 'script',
+    '.png': 'image',
+    '.jpg': 'image',
+    '.jpeg': 'image',
+    '.gif': 'image',
+    '.webp': 'image',
+    '.svg': 'image',
+    '.ico': 'icon',
+    '.woff': 'font',
+    '.woff2': 'font',
+    '.ttf': 'font',
+    '.eot': 'font'
+}
+
+@lru_cache(maxsize=64)
 def get_file_type(extension):
-    """根据扩展名确定文件类型"""
-    type_map = {
-        '.css': 'stylesheet',
-        '.js': 'script',
-        '.png': 'image',
-        '.jpg': 'image',
-        '.jpeg': 'image',
-        '.gif': 'image',
-        '.webp': 'image',
-        '.svg': 'image',
-        '.ico': 'icon',
-        '.woff': 'font',
-        '.woff2': 'font',
-        '.ttf': 'font',
-        '.eot': 'font'
-    }
-    return type_map.get(extension.lower(), 'other')
+    """根据扩展名确定文件类型（扩展名种类很少，结果缓存复用）"""
+    return _FILE_TYPE_MAP.get(extension.lower(), 'other')
+
+def _scan_files(directory, prefix=''):
+    """递归扫描目录下的文件，返回 (DirEntry, 相对路径)
+
+    顺序与 Path.rglob('*') 一致：先列出当前目录的文件，再依次深入子目录（不跟随符号链接目录）。
+    使用 os.scandir 避免对每个文件重复 stat。
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        if entry.is_file():
+            yield entry, prefix + entry.name
+    
+    for entry in entries:
+        if entry.is_dir() and not entry.is_symlink():
+            yield from _scan_files(entry.path, prefix + entry.name + '/')
+
+def _hash_and_stat(item):
+    """计算单个文件的哈希和文件信息（在线程池中执行）"""
+    file_path, relative_path = item
+    return relative_path, generate_file_hash(file_path), get_file_info(file_path)
 
 def generate_manifest():
     """生成资源清单"""
@@ -73,17 +126,21 @@ def generate_manifest():
     print("扫描静态资源文件...")
     
     # 扫描所有文件
-    for file_path in static_dir.rglob('*'):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            relative_path = str(file_path.relative_to(static_dir)).replace('\\', '/')
-            
+    file_paths = []
+    for entry, relative_path in _scan_files(static_dir):
+        if not entry.name.startswith('.'):
             # 跳过临时文件和备份文件
             if any(skip in relative_path for skip in ['.tmp', '.bak', '.old']):
                 continue
             
-            file_hash = generate_file_hash(file_path)
-            file_info = get_file_info(file_path)
-            
+            file_paths.append((entry, relative_path))
+    
+    # 哈希计算和stat在线程池中并行执行（hashlib计算时释放GIL），结果按扫描顺序汇总
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_hash_and_stat, file_paths)
+        
+        for relative_path, file_hash, file_info in results:
             # 生成版本化文件名
             name, ext = os.path.splitext(relative_path)
             versioned_name = f"{name}.{file_hash}{ext}"
@@ -111,8 +168,11 @@ def generate_manifest():
     # 保存清单
     manifest_path = static_dir / 'manifest.json'
     try:
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            manifest_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        else:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
         
         print(f"\n资源清单生成完成:")
         print(f"  总文件数: {manifest['stats']['total_files']}")
@@ -130,11 +190,16 @@ def generate_manifest():
         print(f"保存清单失败: {e}")
         return False
 
-if __name__ == "__main__":
+def main():
+    """脚本入口，返回是否成功（供构建脚本在进程内直接调用）"""
     print("开始生成资源清单...")
     success = generate_manifest()
     if success:
         print("资源清单生成完成！")
     else:
         print("资源清单生成失败！")
+    return success
+
+if __name__ == "__main__":
+    if not main():
         exit(1)
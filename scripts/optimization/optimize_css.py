@@ -2,93 +2,175 @@
 """
 CSS优化脚本
 压缩CSS文件，移除无用代码，生成gzip版本
+
+可选参数：
+  --zopfli  用zopfli生成更小的兼容gzip文件（需要zopfli，耗时更长）
+  --brotli  额外生成 .min.css.br（需要brotli）
 """
 
 import os
+import sys
 import re
 import gzip
+from functools import partial
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
+# 同目录下的共享模块；构建脚本按文件路径加载本脚本时，该目录不一定在 sys.path 中
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from build_utils import is_up_to_date, iter_files
+
+# 可选的更高压缩率编码器（需显式开启，同一命令在不同机器上生成相同的产物）：
+# --zopfli 生成兼容gzip的更小文件，--brotli 额外生成 .br 文件
+try:
+    from zopfli.gzip import compress as zopfli_gzip_compress
+except ImportError:
+    zopfli_gzip_compress = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# 最小化结果中这些字符之后不保留空白
+_CSS_PUNCTUATION = '{}:;,'
+
 def minify_css(css_content):
     """CSS最小化处理"""
     # 移除注释
-    css_content = re.sub(r'/\*.*?\*/', '', css_content, flags=re.DOTALL)
+    css_content = _CSS_COMMENT_RE.sub('', css_content)
     
-    # 移除多余空白
-    css_content = re.sub(r'\s+', ' ', css_content)
-    css_content = re.sub(r';\s*}', '}', css_content)
-    css_content = re.sub(r'{\s*', '{', css_content)
-    css_content = re.sub(r'}\s*', '}', css_content)
-    css_content = re.sub(r':\s*', ':', css_content)
-    css_content = re.sub(r';\s*', ';', css_content)
-    css_content = re.sub(r',\s*', ',', css_content)
+    # 移除多余空白：str.split 按空白切分后以单个空格连接，
+    # 再去掉标点之后的空格和右花括号前的分号（均为C层面的整串替换，无逐个匹配开销）
+    css_content = ' '.join(css_content.split())
+    for char in _CSS_PUNCTUATION:
+        css_content = css_content.replace(char + ' ', char)
+    css_content = css_content.replace(';}', '}')
     
     # 移除行首行尾空白
     css_content = css_content.strip()
     
     return css_content
 
-def optimize_css_files():
-    """优化所有CSS文件"""
+def _process_css_file(css_file, use_zopfli=False, use_brotli=False):
+    """压缩单个CSS文件并生成gzip版本（在进程池的工作进程中执行）
+
+    Args:
+        css_file: CSS源文件路径
+        use_zopfli: 用zopfli生成gzip文件
+        use_brotli: 额外生成brotli文件
+
+    Returns:
+        tuple: (原始大小, 压缩大小, gzip大小, 压缩文件路径, gzip文件路径, brotli文件路径或None)
+    """
+    # 以二进制读取原文件，原始大小直接取字节数，无需再编码一次
+    raw = css_file.read_bytes()
+    content = raw.decode('utf-8')
+    
+    # 压缩
+    minified = minify_css(content)
+    
+    # 编码一次，写文件、gzip压缩和计算大小共用
+    minified_bytes = minified.encode('utf-8')
+    
+    # 保存压缩版本
+    minified_path = css_file.with_suffix('.min.css')
+    minified_path.write_bytes(minified_bytes)
+    
+    # 创建gzip版本（直接在内存中压缩，大小取自压缩结果，无需再读回文件）
+    gzip_path = str(minified_path) + '.gz'
+    if use_zopfli:
+        gzip_data = zopfli_gzip_compress(minified_bytes, numiterations=15)
+    else:
+        gzip_data = gzip.compress(minified_bytes, compresslevel=9)
+    Path(gzip_path).write_bytes(gzip_data)
+    
+    # 创建brotli版本
+    brotli_path = None
+    if use_brotli:
+        brotli_path = str(minified_path) + '.br'
+        Path(brotli_path).write_bytes(brotli.compress(minified_bytes, quality=11, mode=brotli.MODE_TEXT))
+    
+    # 计算大小
+    original_size = len(raw)
+    minified_size = len(minified_bytes)
+    gzip_size = len(gzip_data)
+    
+    return original_size, minified_size, gzip_size, minified_path, gzip_path, brotli_path
+
+def optimize_css_files(use_zopfli=False, use_brotli=False):
+    """优化所有CSS文件
+
+    Args:
+        use_zopfli: 用zopfli生成 .min.css.gz（--zopfli）
+        use_brotli: 额外生成 .min.css.br（--brotli）
+    """
     static_dir = Path('static')
-    css_files = list(static_dir.glob('**/*.css'))
+    css_files = list(iter_files(static_dir, '.css'))
     
     if not css_files:
         print("未找到CSS文件")
         return False
     
+    if use_zopfli and zopfli_gzip_compress is None:
+        print("未安装zopfli，忽略 --zopfli，使用标准gzip")
+        use_zopfli = False
+    if use_brotli and brotli is None:
+        print("未安装brotli，忽略 --brotli")
+        use_brotli = False
+    
     total_original_size = 0
     total_minified_size = 0
     total_gzip_size = 0
     
+    # 跳过已经压缩的文件，以及压缩结果比源文件新的文件（增量构建）
+    # 文件时间无法区分现有 .gz 由zlib还是zopfli生成，--zopfli 时全部重新生成
+    files_to_process = []
     for css_file in css_files:
-        # 跳过已经压缩的文件
         if '.min.' in css_file.name:
             continue
+        minified_path = css_file.with_suffix('.min.css')
+        output_paths = [minified_path, str(minified_path) + '.gz']
+        if use_brotli:
+            output_paths.append(str(minified_path) + '.br')
+        if not use_zopfli and is_up_to_date(css_file, *output_paths):
+            print(f"跳过 {css_file}（已是最新）")
+            continue
+        files_to_process.append(css_file)
+    
+    # 各文件互不依赖，压缩和gzip在多个进程中并行执行；结果按原顺序取回并输出
+    process_file = partial(_process_css_file, use_zopfli=use_zopfli, use_brotli=use_brotli)
+    with Pool(processes=max(1, min(cpu_count(), len(files_to_process)))) as pool:
+        results = pool.imap(process_file, files_to_process)
+        for css_file in files_to_process:
+            print(f"优化 {css_file}")
             
-        print(f"优化 {css_file}")
-        
-        try:
-            # 读取原文件
-            with open(css_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 压缩
-            minified = minify_css(content)
-            
-            # 保存压缩版本
-            minified_path = css_file.with_suffix('.min.css')
-            with open(minified_path, 'w', encoding='utf-8') as f:
-                f.write(minified)
-            
-            # 创建gzip版本
-            gzip_path = str(minified_path) + '.gz'
-            with gzip.open(gzip_path, 'wt', encoding='utf-8') as f:
-                f.write(minified)
-            
-            # 计算大小
-            original_size = len(content.encode('utf-8'))
-            minified_size = len(minified.encode('utf-8'))
-            
-            with open(gzip_path, 'rb') as f:
-                gzip_size = len(f.read())
-            
-            total_original_size += original_size
-            total_minified_size += minified_size
-            total_gzip_size += gzip_size
-            
-            print(f"  原始大小: {original_size:,} bytes")
-            print(f"  压缩大小: {minified_size:,} bytes ({(1 - minified_size/original_size)*100:.1f}% 减少)")
-            print(f"  Gzip大小: {gzip_size:,} bytes ({(1 - gzip_size/original_size)*100:.1f}% 减少)")
-            print(f"  生成文件: {minified_path.name}, {gzip_path}")
-            
-        except Exception as e:
-            print(f"  优化失败: {e}")
-            return False
+            try:
+                original_size, minified_size, gzip_size, minified_path, gzip_path, brotli_path = next(results)
+                
+                total_original_size += original_size
+                total_minified_size += minified_size
+                total_gzip_size += gzip_size
+                
+                print(f"  原始大小: {original_size:,} bytes")
+                print(f"  压缩大小: {minified_size:,} bytes ({(1 - minified_size/original_size)*100:.1f}% 减少)")
+                print(f"  Gzip大小: {gzip_size:,} bytes ({(1 - gzip_size/original_size)*100:.1f}% 减少)")
+                generated = f"{minified_path.name}, {gzip_path}"
+                if brotli_path:
+                    generated += f", {brotli_path}"
+                print(f"  生成文件: {generated}")
+                
+            except Exception as e:
+                print(f"  优化失败: {e}")
+                return False
 
     # 总结
     print(f"\nCSS优化总结:")
-    print(f"  处理文件数: {len([f for f in css_files if '.min.' not in f.name])}")
+    print(f"  处理文件数: {len(files_to_process)}")
     print(f"  总原始大小: {total_original_size:,} bytes")
     print(f"  总压缩大小: {total_minified_size:,} bytes")
     print(f"  总Gzip大小: {total_gzip_size:,} bytes")
@@ -98,11 +180,21 @@ def optimize_css_files():
     
     return True
 
-if __name__ == "__main__":
+def main(use_zopfli=False, use_brotli=False):
+    """脚本入口，返回是否成功（供构建脚本在进程内直接调用）
+
+    Args:
+        use_zopfli, use_brotli: 压缩选项，见 optimize_css_files
+    """
     print("开始CSS优化...")
-    success = optimize_css_files()
+    success = optimize_css_files(use_zopfli=use_zopfli, use_brotli=use_brotli)
     if success:
         print("CSS优化完成！")
     else:
         print("CSS优化失败！")
+    return success
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not main(use_zopfli='--zopfli' in args, use_brotli='--brotli' in args):
         exit(1)
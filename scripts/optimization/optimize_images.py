@@ -4,9 +4,26 @@
 压缩图片，转换格式，生成WebP版本
 """
 
+import io
 import os
+import sys
+from contextlib import redirect_stdout
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
+# 同目录下的共享模块；构建脚本按文件路径加载本脚本时，该目录不一定在 sys.path 中
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from build_utils import is_up_to_date, iter_files
+
+# 可选：安装了pyvips（libvips）时优先使用，否则使用Pillow
+try:
+    import pyvips
+except (ImportError, OSError):  # 未找到libvips动态库时pyvips抛出OSError
+    pyvips = None
+
 def check_pillow():
     """检查Pillow是否已安装"""
     try:
@@ -17,33 +34,75 @@ def check_pillow():
         print("请运行: pip install Pillow")
         return False
 
+def _encode_image(img, image_format, **params):
+    """将图片编码为指定格式，返回编码后的字节"""
+    buffer = io.BytesIO()
+    img.save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+def _encode_with_pillow(image_path, quality):
+    """使用Pillow编码优化版本和WebP版本，返回 (优化版本字节, WebP字节)"""
+    from PIL import Image
+    
+    img = Image.open(image_path)
+    
+    # 转换为RGB（如果是RGBA）
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+    
+    image_format = Image.registered_extensions()[image_path.suffix.lower()]
+    optimized_bytes = _encode_image(img, image_format, optimize=True, quality=quality)
+    webp_bytes = _encode_image(img, 'WebP', optimize=True, quality=quality)
+    return optimized_bytes, webp_bytes
+
+def _encode_with_vips(image_path, quality):
+    """使用libvips编码优化版本和WebP版本，返回 (优化版本字节, WebP字节)
+
+    libvips按块流式处理并使用多线程，大图的速度和内存占用都明显优于Pillow。
+    同一图片需要编码两次，因此使用默认的随机访问模式而非 sequential。
+    """
+    img = pyvips.Image.new_from_file(str(image_path))
+    
+    # 带透明通道时以白色背景合成（与Pillow路径一致）
+    if img.hasalpha():
+        img = img.flatten(background=[255, 255, 255])
+    
+    suffix = image_path.suffix.lower()
+    if suffix in ('.jpg', '.jpeg'):
+        optimized_bytes = img.write_to_buffer(suffix, Q=quality, strip=True, optimize_coding=True)
+    elif suffix == '.png':
+        optimized_bytes = img.write_to_buffer(suffix, compression=9, strip=True)
+    else:
+        optimized_bytes = img.write_to_buffer(suffix)
+    webp_bytes = img.write_to_buffer('.webp', Q=quality, effort=6, strip=True)
+    return optimized_bytes, webp_bytes
+
 def optimize_image(image_path, quality=85):
     """优化单个图片"""
     try:
-        from PIL import Image
-        
         print(f"优化 {image_path}")
         
-        img = Image.open(image_path)
         original_size = os.path.getsize(image_path)
         
-        # 转换为RGB（如果是RGBA）
-        if img.mode in ('RGBA', 'LA'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
+        # 先编码到内存，大小直接取自编码结果，无需再stat输出文件；优先使用libvips
+        if pyvips is not None:
+            optimized_bytes, webp_bytes = _encode_with_vips(image_path, quality)
+        else:
+            optimized_bytes, webp_bytes = _encode_with_pillow(image_path, quality)
         
         # 保存优化版本
         optimized_path = image_path.with_suffix('.optimized' + image_path.suffix)
-        img.save(optimized_path, optimize=True, quality=quality)
+        optimized_path.write_bytes(optimized_bytes)
         
         # 生成WebP版本
         webp_path = image_path.with_suffix('.webp')
-        img.save(webp_path, 'WebP', optimize=True, quality=quality)
+        webp_path.write_bytes(webp_bytes)
         
         # 计算压缩率
-        optimized_size = os.path.getsize(optimized_path)
-        webp_size = os.path.getsize(webp_path)
+        optimized_size = len(optimized_bytes)
+        webp_size = len(webp_bytes)
         
         print(f"  原始: {original_size:,} bytes")
         print(f"  优化: {optimized_size:,} bytes ({(1-optimized_size/original_size)*100:.1f}% 减少)")
@@ -56,17 +115,23 @@ def optimize_image(image_path, quality=85):
         print(f"  优化失败: {e}")
         return 0, 0, 0
 
+def _optimize_image_captured(image_path):
+    """在工作进程中优化单个图片，并收集其输出，由主进程按文件顺序打印"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        sizes = optimize_image(image_path)
+    return sizes, output.getvalue()
+
 def optimize_all_images():
     """优化所有图片"""
-    if not check_pillow():
+    if pyvips is None and not check_pillow():
         return False
     
     static_dir = Path('static')
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif']
+    image_extensions = ('.jpg', '.jpeg', '.png', '.gif')
     
-    image_files = []
-    for ext in image_extensions:
-        image_files.extend(static_dir.glob(f'**/*{ext}'))
+    # 一次遍历收集所有扩展名的图片（扩展名不区分大小写，.JPG/.PNG 同样处理）
+    image_files = list(iter_files(static_dir, image_extensions, ignore_case=True))
     
     if not image_files:
         print("未找到图片文件，跳过图片优化")
@@ -77,13 +142,27 @@ def optimize_all_images():
     total_webp_size = 0
     processed_count = 0
     
+    # 跳过已经优化的文件，以及优化结果比源文件新的图片（增量构建）
+    files_to_process = []
     for image_file in image_files:
-        # 跳过已经优化的文件
         if '.optimized' in image_file.name:
             continue
-            
-        original_size, optimized_size, webp_size = optimize_image(image_file)
-        
+        optimized_path = image_file.with_suffix('.optimized' + image_file.suffix)
+        if is_up_to_date(image_file, optimized_path, image_file.with_suffix('.webp')):
+            print(f"跳过 {image_file}（已是最新）")
+            continue
+        files_to_process.append(image_file)
+    image_files = files_to_process
+    
+    # 图片编码是CPU密集型且各文件互不依赖，使用进程池并行处理；
+    # maxtasksperchild 定期回收工作进程，释放Pillow占用的内存
+    processes = max(1, min(cpu_count(), len(image_files)))
+    chunksize = max(1, len(image_files) // (processes * 2 + 4))
+    with Pool(processes=processes, maxtasksperchild=4) as pool:
+        results = pool.map(_optimize_image_captured, image_files, chunksize=chunksize)
+    
+    for (original_size, optimized_size, webp_size), output in results:
+        print(output, end='')
         if original_size > 0:  # 成功处理
             total_original_size += original_size
             total_optimized_size += optimized_size
@@ -105,11 +184,16 @@ def optimize_all_images():
     
     return True
 
-if __name__ == "__main__":
+def main():
+    """脚本入口，返回是否成功（供构建脚本在进程内直接调用）"""
     print("开始图片优化...")
     success = optimize_all_images()
     if success:
         print("图片优化完成！")
     else:
         print("图片优化失败！")
+    return success
+
+if __name__ == "__main__":
+    if not main():
         exit(1)
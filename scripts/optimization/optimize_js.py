@@ -2,52 +2,255 @@
 """
 JavaScript优化脚本
 压缩JS文件，移除无用代码，生成gzip版本
+
+可选参数：
+  --fast    开发模式，生成 .min.js.lz4 代替 .min.js.gz（需要lz4）
+  --zopfli  用zopfli生成更小的兼容gzip文件（需要zopfli，耗时更长）
+  --brotli  额外生成 .min.js.br（需要brotli）
 """
 
 import os
 import re
 import gzip
+import sys
+import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+# 同目录下的共享模块；构建脚本按文件路径加载本脚本时，该目录不一定在 sys.path 中
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from build_utils import is_up_to_date
+
+# 可选的LZ4编码器：--fast 开发模式下用它代替gzip生成中间产物（压缩速度远快于gzip）
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# 可选的更高压缩率编码器（用于预压缩后静态分发的发布产物）：
+# --zopfli 生成兼容gzip的更小文件，--brotli 额外生成 .br 文件
+try:
+    from zopfli.gzip import compress as zopfli_gzip_compress
+except ImportError:
+    zopfli_gzip_compress = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# gzip流式写入时每次写入的字节数
+GZIP_CHUNK_SIZE = 64 * 1024
+
+# gzip压缩级别：小文件用9级（压缩率更重要，耗时可忽略），其余用6级
+# （比9级快数倍，体积通常只大1-2%）；设置环境变量 JS_GZIP_LEVEL 可固定级别
+JS_GZIP_SMALL_FILE_SIZE = 8 * 1024
+_gzip_level_env = os.environ.get('JS_GZIP_LEVEL')
+JS_GZIP_LEVEL = int(_gzip_level_env) if _gzip_level_env else None
+
+# 按源文件内容缓存压缩结果的目录，内容未变时直接复用（跨构建、跨CI运行）
+JS_CACHE_DIR = Path('cache') / 'js_minify'
+# 缓存中最多保留的条目数，超出时按最近使用时间淘汰
+JS_CACHE_MAX_ENTRIES = 256
+# 压缩规则或gzip参数变化时修改此标识，使旧缓存失效
+_JS_CACHE_PERSON = b'minify_js.v2'
+# 缓存条目中各输出文件的后缀，顺序与输出路径列表一致（压缩文件、gzip、brotli）
+_JS_CACHE_SUFFIXES = ('.min.js', '.min.js.gz', '.min.js.br')
+
+# 预编译的压缩规则
+_JS_LINE_COMMENT_RE = re.compile(r'(?<!:)//.*$', re.MULTILINE)
+_JS_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# 这些符号两侧不保留空白
+_JS_OPERATORS = frozenset(';{},()=+-*/')
+
 def minify_js(js_content):
     """JavaScript最小化（简单版本）"""
+    # 先用子串检查跳过不含注释的内容（如已压缩的第三方脚本），避免无谓的正则扫描
     # 移除单行注释（但保留URL中的//）
-    js_content = re.sub(r'(?<!:)//.*$', '', js_content, flags=re.MULTILINE)
+    if '//' in js_content:
+        js_content = _JS_LINE_COMMENT_RE.sub('', js_content)
     
     # 移除多行注释
-    js_content = re.sub(r'/\*.*?\*/', '', js_content, flags=re.DOTALL)
-    
-    # 移除多余空白，但保留字符串内的空白
-    lines = js_content.split('\n')
-    minified_lines = []
-    
-    for line in lines:
-        # 移除行首行尾空白
-        line = line.strip()
-        if line:  # 跳过空行
-            minified_lines.append(line)
-    
-    # 合并行，在适当位置添加分号
-    js_content = ' '.join(minified_lines)
-    
-    # 基本的空白压缩
-    js_content = re.sub(r'\s*;\s*', ';', js_content)
-    js_content = re.sub(r'\s*{\s*', '{', js_content)
-    js_content = re.sub(r'\s*}\s*', '}', js_content)
-    js_content = re.sub(r'\s*,\s*', ',', js_content)
-    js_content = re.sub(r'\s*\(\s*', '(', js_content)
-    js_content = re.sub(r'\s*\)\s*', ')', js_content)
-    js_content = re.sub(r'\s*=\s*', '=', js_content)
-    js_content = re.sub(r'\s*\+\s*', '+', js_content)
-    js_content = re.sub(r'\s*-\s*', '-', js_content)
-    js_content = re.sub(r'\s*\*\s*', '*', js_content)
-    js_content = re.sub(r'\s*\/\s*', '/', js_content)
-    js_content = re.sub(r'\s+', ' ', js_content)
-    
-    return js_content.strip()
-
-def optimize_js_files():
-    """优化所有JavaScript文件"""
+    if '/*' in js_content:
+        js_content = _JS_BLOCK_COMMENT_RE.sub('', js_content)
+    
+    # 单次遍历按空白切分出的片段，拼接时只在两侧都不是运算符/分隔符的片段之间保留一个空格
+    # （等价于逐行去除首尾空白、去掉符号两侧空白、再把其余空白折叠为单个空格）
+    tokens = []
+    previous_char = None
+    for word in js_content.split():
+        if previous_char is not None and previous_char not in _JS_OPERATORS and word[0] not in _JS_OPERATORS:
+            tokens.append(' ')
+        tokens.append(word)
+        previous_char = word[-1]
+    
+    return ''.join(tokens)
+
+def _gzip_level(size):
+    """按压缩后内容大小选择gzip压缩级别"""
+    if JS_GZIP_LEVEL is not None:
+        return JS_GZIP_LEVEL
+    return 9 if size < JS_GZIP_SMALL_FILE_SIZE else 6
+
+def _cache_key(content_bytes, use_zopfli, use_brotli):
+    """缓存键：源文件内容加上压缩设置（设置不同时生成的输出不同）"""
+    hasher = hashlib.blake2b(digest_size=16, person=_JS_CACHE_PERSON)
+    hasher.update(f'{JS_GZIP_LEVEL}:{use_zopfli}:{use_brotli}'.encode('ascii'))
+    hasher.update(b'\0')
+    hasher.update(content_bytes)
+    return hasher.hexdigest()
+
+def _cache_paths(cache_key):
+    """返回缓存条目各输出文件的路径（压缩文件、gzip、brotli）"""
+    return [JS_CACHE_DIR / f'{cache_key}{suffix}' for suffix in _JS_CACHE_SUFFIXES]
+
+def _install_file(source_path, target_path):
+    """复制文件到目标位置：先写临时文件再原子替换，避免留下写了一半的文件
+
+    临时文件名带进程号，进程池中的多个工作进程同时写入同一缓存条目时互不覆盖；
+    复制或替换失败时删除临时文件后重新抛出异常。
+    """
+    target_path = Path(target_path)
+    temp_path = target_path.with_name(f'{target_path.name}.{os.getpid()}.tmp')
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, target_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def _load_from_cache(cache_key, output_paths):
+    """命中缓存时把缓存的压缩结果安装到各输出位置，返回各输出的大小；未命中返回None"""
+    cached_paths = _cache_paths(cache_key)
+    try:
+        for cached_path, output_path in zip(cached_paths, output_paths):
+            _install_file(cached_path, output_path)
+        # 更新访问时间，供LRU淘汰使用
+        os.utime(cached_paths[0])
+        return [os.path.getsize(output_path) for output_path in output_paths]
+    except OSError:
+        return None
+
+def _store_in_cache(cache_key, output_paths):
+    """把新生成的压缩结果写入缓存（失败时忽略，不影响构建）"""
+    cached_paths = _cache_paths(cache_key)
+    try:
+        JS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # 压缩文件最后写入：淘汰和命中都以它为准，此时其余文件已完整
+        for cached_path, output_path in reversed(list(zip(cached_paths, output_paths))):
+            _install_file(output_path, cached_path)
+    except OSError:
+        pass
+
+def _prune_cache():
+    """缓存条目超过上限时，删除最久未使用的条目"""
+    try:
+        entries = [entry for entry in os.scandir(JS_CACHE_DIR) if entry.name.endswith('.min.js')]
+    except OSError:
+        return
+    
+    if len(entries) <= JS_CACHE_MAX_ENTRIES:
+        return
+    
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - JS_CACHE_MAX_ENTRIES]:
+        for path in _cache_paths(entry.name[:-len('.min.js')]):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _process_js_file(js_file, fast=False, use_zopfli=False, use_brotli=False):
+    """压缩单个JS文件并生成gzip版本（在进程池的工作进程中执行）
+
+    Args:
+        js_file: JS源文件路径
+        fast: 开发模式，生成LZ4中间产物代替gzip，且不读写压缩缓存
+        use_zopfli: 用zopfli生成gzip文件
+        use_brotli: 额外生成brotli文件
+
+    Returns:
+        tuple: (原始大小, 压缩大小, 压缩后大小, 压缩文件路径, 压缩输出路径, brotli文件路径或None)
+    """
+    # 读取原文件：按字节读取后只解码一次，大小直接取自原始字节
+    content_bytes = js_file.read_bytes()
+    content = content_bytes.decode('utf-8')
+    original_size = len(content_bytes)
+    
+    minified_path = js_file.with_suffix('.min.js')
+    gzip_path = str(minified_path) + '.gz'
+    
+    if fast:
+        minified_bytes = minify_js(content).encode('utf-8')
+        minified_path.write_bytes(minified_bytes)
+        lz4_path = minified_path.with_name(minified_path.name + '.lz4')
+        compressed = lz4.frame.compress(minified_bytes, compression_level=0)
+        lz4_path.write_bytes(compressed)
+        return original_size, len(minified_bytes), len(compressed), minified_path, str(lz4_path), None
+    
+    brotli_path = str(minified_path) + '.br' if use_brotli else None
+    output_paths = [minified_path, gzip_path]
+    if brotli_path:
+        output_paths.append(brotli_path)
+    
+    # 相同内容已压缩过时直接复用缓存结果
+    cache_key = _cache_key(content_bytes, use_zopfli, use_brotli)
+    cached_sizes = _load_from_cache(cache_key, output_paths)
+    if cached_sizes is not None:
+        minified_size, gzip_size = cached_sizes[:2]
+        return original_size, minified_size, gzip_size, minified_path, gzip_path, brotli_path
+    
+    # 压缩
+    minified = minify_js(content)
+    
+    # 编码一次，写文件、gzip压缩和计算大小共用
+    minified_bytes = minified.encode('utf-8')
+    
+    # 保存压缩版本
+    minified_path.write_bytes(minified_bytes)
+    
+    if use_zopfli:
+        # zopfli输出兼容gzip但体积更小，压缩耗时由所有请求分摊
+        gzip_data = zopfli_gzip_compress(minified_bytes, numiterations=15)
+        Path(gzip_path).write_bytes(gzip_data)
+        gzip_size = len(gzip_data)
+    else:
+        # 创建gzip版本（mtime固定为0，相同内容生成相同文件，便于缓存；级别按大小选择）
+        # 分块流式写入输出文件，不在内存中保留完整的压缩结果；大小取自写入位置
+        with open(gzip_path, 'wb') as f:
+            with gzip.GzipFile(filename='', mode='wb', compresslevel=_gzip_level(len(minified_bytes)), fileobj=f, mtime=0) as gz:
+                view = memoryview(minified_bytes)
+                for start in range(0, len(view), GZIP_CHUNK_SIZE):
+                    gz.write(view[start:start + GZIP_CHUNK_SIZE])
+            gzip_size = f.tell()
+    
+    # 创建brotli版本
+    if brotli_path:
+        Path(brotli_path).write_bytes(brotli.compress(minified_bytes, quality=11, mode=brotli.MODE_TEXT))
+    
+    _store_in_cache(cache_key, output_paths)
+    
+    # 计算大小
+    minified_size = len(minified_bytes)
+    
+    return original_size, minified_size, gzip_size, minified_path, gzip_path, brotli_path
+
+def optimize_js_files(fast=False, use_zopfli=False, use_brotli=False):
+    """优化所有JavaScript文件
+
+    Args:
+        fast: 开发模式（--fast），生成 .min.js.lz4 代替发布用的 .min.js.gz
+        use_zopfli: 用zopfli生成 .min.js.gz（--zopfli）
+        use_brotli: 额外生成 .min.js.br（--brotli）
+    """
     static_dir = Path('static')
     js_files = list(static_dir.glob('**/*.js'))
     
@@ -55,72 +258,96 @@ def optimize_js_files():
         print("未找到JavaScript文件")
         return False
     
+    # 未安装lz4时开发模式不可用，照常生成gzip（不能用低级别gzip覆盖发布产物）
+    if fast and lz4 is None:
+        print("未安装lz4，忽略 --fast，照常生成gzip版本")
+        fast = False
+    if use_zopfli and zopfli_gzip_compress is None:
+        print("未安装zopfli，忽略 --zopfli，使用标准gzip")
+        use_zopfli = False
+    if use_brotli and brotli is None:
+        print("未安装brotli，忽略 --brotli")
+        use_brotli = False
+    compressed_label = 'LZ4' if fast else 'Gzip'
+    
     total_original_size = 0
     total_minified_size = 0
     total_gzip_size = 0
     
+    # 读取文件之前先过滤：跳过已经压缩的文件，以及压缩结果比源文件新的文件（增量构建）
+    # 文件时间无法区分现有 .gz 由zlib还是zopfli生成，--zopfli 时全部交给后续处理
+    # （内容缓存的键包含zopfli设置，已用zopfli压缩过的内容直接从缓存复制）
+    files_to_process = []
     for js_file in js_files:
-        # 跳过已经压缩的文件
         if '.min.' in js_file.name:
             continue
+        minified_path = js_file.with_suffix('.min.js')
+        output_paths = [minified_path, str(minified_path) + ('.lz4' if fast else '.gz')]
+        if use_brotli and not fast:
+            output_paths.append(str(minified_path) + '.br')
+        if not use_zopfli and is_up_to_date(js_file, *output_paths):
+            print(f"跳过 {js_file}（已是最新）")
+            continue
+        files_to_process.append(js_file)
+    
+    # 最小化是纯Python的CPU密集型计算，各文件在多个进程中并行处理；结果按原顺序取回并输出
+    with ProcessPoolExecutor(max_workers=max(1, min(os.cpu_count() or 1, len(files_to_process)))) as executor:
+        results = executor.map(
+            _process_js_file, files_to_process, repeat(fast), repeat(use_zopfli), repeat(use_brotli)
+        )
+        for js_file in files_to_process:
+            print(f"优化 {js_file}")
             
-        print(f"优化 {js_file}")
-        
-        try:
-            # 读取原文件
-            with open(js_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 压缩
-            minified = minify_js(content)
-            
-            # 保存压缩版本
-            minified_path = js_file.with_suffix('.min.js')
-            with open(minified_path, 'w', encoding='utf-8') as f:
-                f.write(minified)
-            
-            # 创建gzip版本
-            gzip_path = str(minified_path) + '.gz'
-            with gzip.open(gzip_path, 'wt', encoding='utf-8') as f:
-                f.write(minified)
-            
-            # 计算大小
-            original_size = len(content.encode('utf-8'))
-            minified_size = len(minified.encode('utf-8'))
-            
-            with open(gzip_path, 'rb') as f:
-                gzip_size = len(f.read())
-            
-            total_original_size += original_size
-            total_minified_size += minified_size
-            total_gzip_size += gzip_size
-            
-            print(f"  原始大小: {original_size:,} bytes")
-            print(f"  压缩大小: {minified_size:,} bytes ({(1 - minified_size/original_size)*100:.1f}% 减少)")
-            print(f"  Gzip大小: {gzip_size:,} bytes ({(1 - gzip_size/original_size)*100:.1f}% 减少)")
-            print(f"  生成文件: {minified_path.name}, {gzip_path}")
-            
-        except Exception as e:
-            print(f"  优化失败: {e}")
-            return False
+            try:
+                original_size, minified_size, gzip_size, minified_path, gzip_path, brotli_path = next(results)
+                
+                total_original_size += original_size
+                total_minified_size += minified_size
+                total_gzip_size += gzip_size
+                
+                print(f"  原始大小: {original_size:,} bytes")
+                print(f"  压缩大小: {minified_size:,} bytes ({(1 - minified_size/original_size)*100:.1f}% 减少)")
+                print(f"  {compressed_label}大小: {gzip_size:,} bytes ({(1 - gzip_size/original_size)*100:.1f}% 减少)")
+                generated = f"{minified_path.name}, {gzip_path}"
+                if brotli_path:
+                    generated += f", {brotli_path}"
+                print(f"  生成文件: {generated}")
+                
+            except Exception as e:
+                print(f"  优化失败: {e}")
+                return False
 
+    if not fast:
+        _prune_cache()
+    
     # 总结
     print(f"\nJavaScript优化总结:")
-    print(f"  处理文件数: {len([f for f in js_files if '.min.' not in f.name])}")
+    print(f"  处理文件数: {len(files_to_process)}")
     print(f"  总原始大小: {total_original_size:,} bytes")
     print(f"  总压缩大小: {total_minified_size:,} bytes")
-    print(f"  总Gzip大小: {total_gzip_size:,} bytes")
+    print(f"  总{compressed_label}大小: {total_gzip_size:,} bytes")
     if total_original_size > 0:
         print(f"  总压缩率: {(1 - total_minified_size/total_original_size)*100:.1f}%")
-        print(f"  总Gzip压缩率: {(1 - total_gzip_size/total_original_size)*100:.1f}%")
+        print(f"  总{compressed_label}压缩率: {(1 - total_gzip_size/total_original_size)*100:.1f}%")
     
     return True
 
-if __name__ == "__main__":
+def main(fast=False, use_zopfli=False, use_brotli=False):
+    """脚本入口，返回是否成功（供构建脚本在进程内直接调用）
+
+    Args:
+        fast, use_zopfli, use_brotli: 压缩选项，见 optimize_js_files
+    """
     print("开始JavaScript优化...")
-    success = optimize_js_files()
+    success = optimize_js_files(fast=fast, use_zopfli=use_zopfli, use_brotli=use_brotli)
     if success:
         print("JavaScript优化完成！")
     else:
         print("JavaScript优化失败！")
+    return success
+
+if __name__ == "__main__":
+    # --fast 用于开发/监听模式的快速重建；默认（发布）仍生成标准gzip
+    args = sys.argv[1:]
+    if not main(fast='--fast' in args, use_zopfli='--zopfli' in args, use_brotli='--brotli' in args):
         exit(1)
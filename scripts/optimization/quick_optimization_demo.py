@@ -14,8 +14,11 @@ python scripts/optimization/quick_optimization_demo.py
 
 import sys
 import os
+import re
 import time
 import json
+import hashlib
+from functools import lru_cache
 from typing import List, Dict, Any
 
 # 添加项目根目录到路径
@@ -26,11 +29,54 @@ sys.path.insert(0, PROJECT_ROOT)
 try:
     from src.app.policy.lightweight_manager import LightweightPolicyManager
     from src.core.cache import CacheManager
+    from scripts.testing.bench_stats import median_and_p95
 except ImportError as e:
     print(f"导入模块失败: {e}")
     print("请确保在项目根目录运行此脚本")
     sys.exit(1)
 
+# 政策类别对应的emoji（模块级常量，避免每次格式化时重建）
+_EMOJI_MAP = {
+    "配送相关": "📦",
+    "付款相关": "💰",
+    "取货相关": "📍",
+    "质量相关": "✅",
+    "群规相关": "📋"
+}
+
+# 格式化政策响应时固定追加的温馨提示
+_POLICY_RESPONSE_SUFFIX = "💡 **温馨提示**：\n• 如有疑问请随时询问\n• 感谢您的理解与配合 ❤️"
+
+# 推荐演示使用的类别关键词及相关问题
+_RECOMMENDATION_RULES = {
+    "配送": ["配送范围包括哪些地区？", "什么条件可以免费配送？", "外围地区运费如何计算？"],
+    "付款": ["付款备注格式是什么？", "可以用现金付款吗？", "如何避免手续费？"],
+    "取货": ["取货时需要带什么？", "可以代取货吗？", "取货时间可以调整吗？"],
+    "质量": ["什么情况下可以退款？", "如何申请退换货？", "质量问题如何反馈？"]
+}
+
+# 所有类别关键词编译成一个多选正则，一次扫描查询即可找出出现的关键词
+_RECOMMENDATION_RULE_RE = re.compile('|'.join(map(re.escape, _RECOMMENDATION_RULES)))
+
+def _detect_recommendation_category(query: str):
+    """检测查询所属的推荐类别；多个关键词同时出现时按规则顺序取第一个"""
+    matched = set(_RECOMMENDATION_RULE_RE.findall(query))
+    if not matched:
+        return None
+    for key in _RECOMMENDATION_RULES:
+        if key in matched:
+            return key
+    return None
+
+@lru_cache(maxsize=256)
+def _policy_cache_key(query: str) -> str:
+    """政策查询的缓存键（按查询记忆化，重复查询不再重新计算）
+
+    使用稳定的BLAKE2b摘要而不是内置hash()：内置hash每次启动随机化，
+    无法用于Redis等跨进程共享的缓存。
+    """
+    return "policy:" + hashlib.blake2b(query.encode('utf-8'), digest_size=8).hexdigest()
+
 class OptimizationDemo:
     """性能优化演示类"""
     
@@ -92,17 +138,17 @@ class OptimizationDemo:
         cold_times = []
         
         for query in self.test_queries[:3]:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             results = self.policy_manager.search_policy(query, top_k=2)
-            end_time = time.time()
+            end_ns = time.perf_counter_ns()
             
-            query_time = (end_time - start_time) * 1000
+            query_time = (end_ns - start_ns) / 1_000_000
             cold_times.append(query_time)
             
-            print(f"  '{query}' -> {len(results)} 结果, {query_time:.2f}ms")
+            print(f"  '{query}' -> {len(results)} 结果, {query_time:.3f}ms")
             
             # 模拟缓存存储
-            cache_key = f"policy:{hash(query)}"
+            cache_key = _policy_cache_key(query)
             self.cache_manager.set_cache(cache_key, results, ttl_seconds=3600)
         
         # 第二次查询（有缓存）
@@ -110,10 +156,10 @@ class OptimizationDemo:
         warm_times = []
         
         for query in self.test_queries[:3]:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             
             # 尝试从缓存获取
-            cache_key = f"policy:{hash(query)}"
+            cache_key = _policy_cache_key(query)
             cached_results = self.cache_manager.get_cache(cache_key)
             
             if cached_results:
@@ -121,13 +167,13 @@ class OptimizationDemo:
             else:
                 results = self.policy_manager.search_policy(query, top_k=2)
             
-            end_time = time.time()
+            end_ns = time.perf_counter_ns()
             
-            query_time = (end_time - start_time) * 1000
+            query_time = (end_ns - start_ns) / 1_000_000
             warm_times.append(query_time)
             
             cache_status = "✅ 缓存命中" if cached_results else "❌ 缓存未命中"
-            print(f"  '{query}' -> {len(results)} 结果, {query_time:.2f}ms ({cache_status})")
+            print(f"  '{query}' -> {len(results)} 结果, {query_time:.3f}ms ({cache_status})")
         
         # 性能对比
         avg_cold = sum(cold_times) / len(cold_times)
@@ -135,8 +181,8 @@ class OptimizationDemo:
         improvement = ((avg_cold - avg_warm) / avg_cold) * 100
         
         print(f"\n📈 性能提升:")
-        print(f"  无缓存平均时间: {avg_cold:.2f}ms")
-        print(f"  有缓存平均时间: {avg_warm:.2f}ms")
+        print(f"  无缓存平均时间: {avg_cold:.3f}ms")
+        print(f"  有缓存平均时间: {avg_warm:.3f}ms")
         print(f"  性能提升: {improvement:.1f}%")
     
     def demo_search_algorithms(self):
@@ -154,9 +200,9 @@ class OptimizationDemo:
         for query, test_type in test_cases:
             print(f"\n🔍 测试查询: '{query}' ({test_type})")
             
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             results = self.policy_manager.search_policy(query, top_k=3)
-            search_time = (time.time() - start_time) * 1000
+            search_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             print(f"  搜索时间: {search_time:.2f}ms")
             print(f"  找到结果: {len(results)} 条")
@@ -171,28 +217,17 @@ class OptimizationDemo:
         print("\n3️⃣ 智能推荐演示")
         print("-" * 30)
         
-        # 模拟推荐逻辑
-        recommendation_rules = {
-            "配送": ["配送范围包括哪些地区？", "什么条件可以免费配送？", "外围地区运费如何计算？"],
-            "付款": ["付款备注格式是什么？", "可以用现金付款吗？", "如何避免手续费？"],
-            "取货": ["取货时需要带什么？", "可以代取货吗？", "取货时间可以调整吗？"],
-            "质量": ["什么情况下可以退款？", "如何申请退换货？", "质量问题如何反馈？"]
-        }
-        
+        # 模拟推荐逻辑（规则见模块级 _RECOMMENDATION_RULES）
         test_queries = ["配送时间", "付款方式", "取货地点", "质量保证"]
         
         for query in test_queries:
             print(f"\n🤔 用户查询: '{query}'")
             
             # 简单的类别检测
-            category = None
-            for key in recommendation_rules:
-                if key in query:
-                    category = key
-                    break
+            category = _detect_recommendation_category(query)
             
             if category:
-                recommendations = recommendation_rules[category]
+                recommendations = _RECOMMENDATION_RULES[category]
                 print(f"  💡 智能推荐 ({category}相关):")
                 for i, rec in enumerate(recommendations, 1):
                     print(f"    {i}. {rec}")
@@ -229,23 +264,9 @@ class OptimizationDemo:
     
     def format_policy_response(self, content: str, category: str) -> str:
         """格式化政策响应（简化版）"""
-        emoji_map = {
-            "配送相关": "📦",
-            "付款相关": "💰",
-            "取货相关": "📍",
-            "质量相关": "✅",
-            "群规相关": "📋"
-        }
-        
-        emoji = emoji_map.get(category, "📋")
-        
-        formatted = f"{emoji} **{category}**\n\n"
-        formatted += f"• {content}\n\n"
-        formatted += f"💡 **温馨提示**：\n"
-        formatted += f"• 如有疑问请随时询问\n"
-        formatted += f"• 感谢您的理解与配合 ❤️"
+        emoji = _EMOJI_MAP.get(category, "📋")
         
-        return formatted
+        return "\n\n".join((f"{emoji} **{category}**", f"• {content}", _POLICY_RESPONSE_SUFFIX))
     
     def show_optimization_summary(self):
         """显示优化效果总结"""
@@ -283,28 +304,31 @@ class OptimizationDemo:
         print("-" * 30)
         
         iterations = 50
-        total_time = 0
+        query_times_ns = []
         
         print(f"执行 {iterations} 次查询测试...")
         
         for i in range(iterations):
             query = self.test_queries[i % len(self.test_queries)]
             
-            start_time = time.time()
-            results = self.policy_manager.search_policy(query, top_k=3)
-            end_time = time.time()
-            
-            query_time = end_time - start_time
-            total_time += query_time
+            start_ns = time.perf_counter_ns()
+            self.policy_manager.search_policy(query, top_k=3)
+            query_times_ns.append(time.perf_counter_ns() - start_ns)
             
             if i % 10 == 0:
                 print(f"  完成 {i}/{iterations} 次测试")
         
-        avg_time = (total_time / iterations) * 1000
+        total_time = sum(query_times_ns) / 1_000_000_000
         qps = iterations / total_time
         
+        # 中位数去掉首尾各10%的样本后计算，P95取自全部样本
+        median_ns, p95_ns = median_and_p95(query_times_ns)
+        median_time = median_ns / 1_000_000
+        p95_time = p95_ns / 1_000_000
+        
         print(f"\n📊 基准测试结果:")
-        print(f"  平均响应时间: {avg_time:.2f}ms")
+        print(f"  响应时间中位数: {median_time:.3f}ms")
+        print(f"  响应时间P95: {p95_time:.3f}ms")
         print(f"  每秒查询数(QPS): {qps:.1f}")
         print(f"  总测试时间: {total_time:.2f}s")
 
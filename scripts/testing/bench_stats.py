@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+基准测试耗时统计
+"""
+
+import math
+import statistics
+
+def median_and_p95(samples_ns):
+    """统计多次测量的耗时样本（纳秒），返回 (中位数, P95)
+
+    中位数在去掉最快和最慢各10%的样本（预热和离群值）后计算，避免被计时噪声主导；
+    P95 按最近秩法取自全部样本，反映真实的尾部延迟。
+    """
+    samples = sorted(samples_ns)
+    trim = len(samples) // 10
+    median = statistics.median(samples[trim:len(samples) - trim])
+    p95 = samples[max(0, math.ceil(len(samples) * 0.95) - 1)]
+    return median, p95
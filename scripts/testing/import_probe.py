@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+子进程探测工具
+在干净的子进程中执行探测代码，测量不受当前进程模块缓存（sys.modules）影响的冷启动结果
+"""
+
+import os
+import sys
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+# 冷启动导入应用并输出耗时（纳秒）
+_IMPORT_PROBE_CODE = """
+import time
+start_ns = time.perf_counter_ns()
+import app
+print(time.perf_counter_ns() - start_ns)
+"""
+
+def run_probe(code: str) -> str:
+    """在项目根目录下用当前解释器执行探测代码，返回其标准输出；子进程失败时抛出 RuntimeError（取stderr最后一行）"""
+    probe = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if probe.returncode != 0:
+        error_lines = probe.stderr.strip().splitlines()
+        raise RuntimeError(error_lines[-1] if error_lines else f"退出码 {probe.returncode}")
+    return probe.stdout
+
+def measure_app_import_ns() -> int:
+    """在子进程中冷启动导入应用，返回导入耗时（纳秒）；导入失败时抛出 RuntimeError"""
+    return int(run_probe(_IMPORT_PROBE_CODE).split()[-1])
@@ -10,6 +10,14 @@ import os
 import time
 import logging
 
+# 项目根目录加入路径：共享的测试工具按包路径（scripts.testing）导入，
+# 直接运行或经 runpy.run_path 运行本脚本时均可找到
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from scripts.testing.import_probe import measure_app_import_ns
+
 # 设置环境变量
 os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
 os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
@@ -25,8 +33,8 @@ def test_app_import_speed():
     start_time = time.time()
     
     try:
-        import app
-        import_time = time.time() - start_time
+        # 当前进程中 app 可能已被导入（sys.modules缓存），在子进程中测量真实的冷启动导入
+        import_time = measure_app_import_ns() / 1_000_000_000
         print(f"✅ 应用导入成功，耗时: {import_time:.2f}秒")
         
         if import_time > 30:
@@ -10,24 +10,85 @@ import os
 import logging
 import requests
 import json
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any
 
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    RedisError = None
+
 # 添加项目根目录到路径
-PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+def _module_available(name: str) -> bool:
+    """只解析模块查找器判断模块是否存在，不执行模块代码"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# 被测模块在加载脚本时检查并导入一次，测试函数中不再重复导入
+_HAS_REDIS = _module_available('src.core.redis_cache')
+_HAS_CACHE = _module_available('src.core.cache')
+_HAS_MONITOR = _module_available('src.core.performance_monitor')
+
+# Redis运行期故障：内置连接错误，以及redis库自己的异常（与内置ConnectionError无继承关系）
+_REDIS_RUNTIME_ERRORS = (ConnectionError, RedisError) if RedisError is not None else (ConnectionError,)
+
+if _HAS_REDIS:
+    from src.core.redis_cache import RedisCacheManager
+if _HAS_CACHE:
+    from src.core.cache import CacheManager
+if _HAS_MONITOR:
+    from src.core.performance_monitor import PerformanceMonitor, monitor_performance
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 日志中输出JSON用的编码器（只创建一次）
+_encode_json = json.JSONEncoder(indent=2, ensure_ascii=False).encode
+
+class _LazyJson:
+    """日志参数包装：只有日志真正输出时才把数据编码为JSON"""
+    __slots__ = ('data',)
+    
+    def __init__(self, data):
+        self.data = data
+    
+    def __str__(self):
+        return _encode_json(self.data)
+
+# 所有API请求共用一个会话，复用连接池中的TCP连接
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+# 需要检查的监控相关接口：(路径, 名称)
+_MONITORING_ENDPOINTS = [
+    ("/health", "健康检查"),
+    ("/monitoring/api/metrics", "监控指标"),
+    ("/monitoring/api/cache", "缓存统计"),
+    ("/monitoring/api/health", "监控健康"),
+]
+
+# 聊天测试同时发出的最大请求数（不超过连接池大小）
+CHAT_CONCURRENCY = 4
+
 def test_redis_cache():
     """测试Redis缓存功能"""
     logger.info("=== 测试Redis缓存功能 ===")
     
+    if not _HAS_REDIS:
+        logger.error("Redis缓存模块不可用，跳过Redis测试")
+        return False
+    
     try:
-        from src.core.redis_cache import RedisCacheManager
-        
         # 初始化Redis缓存管理器
         redis_cache = RedisCacheManager()
         
@@ -57,11 +118,11 @@ def test_redis_cache():
         
         # 获取缓存统计
         stats = redis_cache.get_stats()
-        logger.info(f"缓存统计: {json.dumps(stats, indent=2, ensure_ascii=False)}")
+        logger.info("缓存统计: %s", _LazyJson(stats))
         
         # 健康检查
         health = redis_cache.health_check()
-        logger.info(f"健康检查: {json.dumps(health, indent=2, ensure_ascii=False)}")
+        logger.info("健康检查: %s", _LazyJson(health))
         
         # 清理测试数据
         redis_cache.delete(test_key)
@@ -69,10 +130,7 @@ def test_redis_cache():
         
         return True
         
-    except ImportError:
-        logger.error("Redis库未安装，跳过Redis测试")
-        return False
-    except Exception as e:
+    except _REDIS_RUNTIME_ERRORS as e:
         logger.error(f"Redis缓存测试失败: {e}")
         return False
 
@@ -80,9 +138,11 @@ def test_integrated_cache():
     """测试集成缓存系统"""
     logger.info("=== 测试集成缓存系统 ===")
     
+    if not _HAS_CACHE:
+        logger.error("缓存模块不可用，跳过集成缓存测试")
+        return False
+    
     try:
-        from src.core.cache import CacheManager
-        
         # 初始化缓存管理器（启用Redis）
         cache_manager = CacheManager(enable_redis=True)
         
@@ -103,15 +163,15 @@ def test_integrated_cache():
         
         # 获取缓存统计
         stats = cache_manager.get_cache_stats()
-        logger.info(f"集成缓存统计: {json.dumps(stats, indent=2, ensure_ascii=False)}")
+        logger.info("集成缓存统计: %s", _LazyJson(stats))
         
         # 健康检查
         health = cache_manager.health_check()
-        logger.info(f"集成缓存健康检查: {json.dumps(health, indent=2, ensure_ascii=False)}")
+        logger.info("集成缓存健康检查: %s", _LazyJson(health))
         
         return True
         
-    except Exception as e:
+    except _REDIS_RUNTIME_ERRORS as e:
         logger.error(f"集成缓存测试失败: {e}")
         return False
 
@@ -119,9 +179,11 @@ def test_performance_monitor():
     """测试性能监控系统"""
     logger.info("=== 测试性能监控系统 ===")
     
+    if not _HAS_MONITOR:
+        logger.error("性能监控模块不可用，跳过性能监控测试")
+        return False
+    
     try:
-        from src.core.performance_monitor import PerformanceMonitor, monitor_performance
-        
         # 初始化性能监控器
         monitor = PerformanceMonitor(enable_detailed_monitoring=True)
         
@@ -141,7 +203,7 @@ def test_performance_monitor():
         
         # 获取性能摘要
         summary = monitor.get_performance_summary(time_window_minutes=5)
-        logger.info(f"性能摘要: {json.dumps(summary, indent=2, ensure_ascii=False)}")
+        logger.info("性能摘要: %s", _LazyJson(summary))
         
         # 测试装饰器
         @monitor_performance(monitor, endpoint='/test_decorator')
@@ -155,7 +217,7 @@ def test_performance_monitor():
         
         # 再次获取摘要查看装饰器效果
         summary_after = monitor.get_performance_summary(time_window_minutes=5)
-        logger.info(f"装饰器后性能摘要: {json.dumps(summary_after, indent=2, ensure_ascii=False)}")
+        logger.info("装饰器后性能摘要: %s", _LazyJson(summary_after))
         
         logger.info("✅ 性能监控系统正常")
         
@@ -173,45 +235,22 @@ def test_monitoring_api(base_url="http://localhost:5000"):
     logger.info("=== 测试监控API接口 ===")
     
     try:
-        # 测试健康检查
-        logger.info("测试健康检查API...")
-        response = requests.get(f"{base_url}/health", timeout=10)
-        if response.status_code == 200:
-            health_data = response.json()
-            logger.info(f"健康检查响应: {json.dumps(health_data, indent=2, ensure_ascii=False)}")
-            logger.info("✅ 健康检查API正常")
-        else:
-            logger.error(f"❌ 健康检查API异常: {response.status_code}")
-        
-        # 测试监控指标API
-        logger.info("测试监控指标API...")
-        response = requests.get(f"{base_url}/monitoring/api/metrics", timeout=10)
-        if response.status_code == 200:
-            metrics_data = response.json()
-            logger.info(f"监控指标响应: {json.dumps(metrics_data, indent=2, ensure_ascii=False)}")
-            logger.info("✅ 监控指标API正常")
-        else:
-            logger.error(f"❌ 监控指标API异常: {response.status_code}")
-        
-        # 测试缓存统计API
-        logger.info("测试缓存统计API...")
-        response = requests.get(f"{base_url}/monitoring/api/cache", timeout=10)
-        if response.status_code == 200:
-            cache_data = response.json()
-            logger.info(f"缓存统计响应: {json.dumps(cache_data, indent=2, ensure_ascii=False)}")
-            logger.info("✅ 缓存统计API正常")
-        else:
-            logger.error(f"❌ 缓存统计API异常: {response.status_code}")
-        
-        # 测试监控健康API
-        logger.info("测试监控健康API...")
-        response = requests.get(f"{base_url}/monitoring/api/health", timeout=10)
-        if response.status_code == 200:
-            health_data = response.json()
-            logger.info(f"监控健康响应: {json.dumps(health_data, indent=2, ensure_ascii=False)}")
-            logger.info("✅ 监控健康API正常")
-        else:
-            logger.error(f"❌ 监控健康API异常: {response.status_code}")
+        # 各接口互不依赖，并发请求；结果按原顺序输出
+        for _, name in _MONITORING_ENDPOINTS:
+            logger.info(f"测试{name}API...")
+        with ThreadPoolExecutor(max_workers=len(_MONITORING_ENDPOINTS)) as executor:
+            responses = list(executor.map(
+                lambda endpoint: _SESSION.get(f"{base_url}{endpoint[0]}", timeout=10),
+                _MONITORING_ENDPOINTS
+            ))
+        
+        for (_, name), response in zip(_MONITORING_ENDPOINTS, responses):
+            if response.status_code == 200:
+                data = response.json()
+                logger.info("%s响应: %s", name, _LazyJson(data))
+                logger.info(f"✅ {name}API正常")
+            else:
+                logger.error(f"❌ {name}API异常: {response.status_code}")
         
         return True
         
@@ -235,33 +274,36 @@ def test_chat_with_monitoring(base_url="http://localhost:5000"):
             "怎么付款"
         ]
         
-        for message in test_messages:
-            logger.info(f"发送测试消息: {message}")
-            
-            response = requests.post(
+        def send(message):
+            return _SESSION.post(
                 f"{base_url}/chat",
                 json={"message": message, "user_id": "test_user"},
                 timeout=30
             )
-            
+        
+        # 并发发送测试消息，服务端处理时间相互重叠；结果按原顺序输出
+        for message in test_messages:
+            logger.info(f"发送测试消息: {message}")
+        with ThreadPoolExecutor(max_workers=CHAT_CONCURRENCY) as executor:
+            responses = list(executor.map(send, test_messages))
+        
+        for response in responses:
             if response.status_code == 200:
                 chat_response = response.json()
                 logger.info(f"聊天响应: {chat_response.get('message', 'N/A')[:50]}...")
             else:
                 logger.error(f"聊天请求失败: {response.status_code}")
-            
-            time.sleep(1)  # 避免请求过快
         
         # 等待监控数据更新
         time.sleep(2)
         
         # 检查监控数据是否记录了这些请求
-        response = requests.get(f"{base_url}/monitoring/api/metrics", timeout=10)
+        response = _SESSION.get(f"{base_url}/monitoring/api/metrics", timeout=10)
         if response.status_code == 200:
             metrics = response.json()
             chat_endpoint_stats = metrics.get('endpoints', {}).get('POST:/chat', {})
             if chat_endpoint_stats:
-                logger.info(f"聊天端点统计: {json.dumps(chat_endpoint_stats, indent=2)}")
+                logger.info("聊天端点统计: %s", _LazyJson(chat_endpoint_stats))
                 logger.info("✅ 聊天功能监控正常")
             else:
                 logger.warning("⚠️ 未找到聊天端点监控数据")
@@ -275,64 +317,68 @@ def test_chat_with_monitoring(base_url="http://localhost:5000"):
         logger.error(f"聊天功能监控测试失败: {e}")
         return False
 
+# 报告中的固定文本只构造一次
+_REPORT_RULE = "=" * 60
+_REPORT_STATUS = {True: "✅ 通过", False: "❌ 失败"}
+
 def generate_test_report(results: Dict[str, bool]):
     """生成测试报告"""
     logger.info("=== 测试报告 ===")
     
-    print("\n" + "="*60)
-    print("Redis缓存和性能监控测试报告")
-    print("="*60)
-    
     total_tests = len(results)
     passed_tests = sum(results.values())
     
-    print(f"\n总测试数: {total_tests}")
-    print(f"通过测试: {passed_tests}")
-    print(f"失败测试: {total_tests - passed_tests}")
-    print(f"通过率: {passed_tests/total_tests*100:.1f}%")
-    
-    print(f"\n详细结果:")
-    for test_name, result in results.items():
-        status = "✅ 通过" if result else "❌ 失败"
-        print(f"  {test_name}: {status}")
+    # 先收集所有行，最后一次性写出
+    lines = [
+        "\n" + _REPORT_RULE,
+        "Redis缓存和性能监控测试报告",
+        _REPORT_RULE,
+        f"\n总测试数: {total_tests}",
+        f"通过测试: {passed_tests}",
+        f"失败测试: {total_tests - passed_tests}",
+        f"通过率: {passed_tests/total_tests*100:.1f}%",
+        "\n详细结果:",
+    ]
+    lines.extend(f"  {test_name}: {_REPORT_STATUS[bool(result)]}" for test_name, result in results.items())
     
-    print(f"\n建议:")
+    lines.append("\n建议:")
     if not results.get('redis_cache', False):
-        print("  - 安装并启动Redis服务器")
-        print("  - 检查Redis连接配置")
+        lines.append("  - 安装并启动Redis服务器")
+        lines.append("  - 检查Redis连接配置")
     
     if not results.get('monitoring_api', False):
-        print("  - 启动Chat AI应用服务器")
-        print("  - 检查监控蓝图是否正确注册")
+        lines.append("  - 启动Chat AI应用服务器")
+        lines.append("  - 检查监控蓝图是否正确注册")
     
     if passed_tests == total_tests:
-        print(f"\n🎉 所有测试通过！Redis缓存和性能监控系统工作正常。")
-        print(f"访问监控仪表板: http://localhost:5000/monitoring/dashboard")
+        lines.append("\n🎉 所有测试通过！Redis缓存和性能监控系统工作正常。")
+        lines.append("访问监控仪表板: http://localhost:5000/monitoring/dashboard")
     else:
-        print(f"\n⚠️ 部分测试失败，请检查相关配置。")
+        lines.append("\n⚠️ 部分测试失败，请检查相关配置。")
     
-    print("="*60)
+    lines.append(_REPORT_RULE)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """主测试函数"""
     logger.info("开始Redis缓存和性能监控测试...")
     
-    results = {}
-    
-    # 测试Redis缓存
-    results['redis_cache'] = test_redis_cache()
-    
-    # 测试集成缓存
-    results['integrated_cache'] = test_integrated_cache()
+    tests = [
+        ('redis_cache', test_redis_cache),                  # 测试Redis缓存
+        ('integrated_cache', test_integrated_cache),        # 测试集成缓存
+        ('performance_monitor', test_performance_monitor),  # 测试性能监控
+        ('monitoring_api', test_monitoring_api),            # 测试监控API
+        ('chat_monitoring', test_chat_with_monitoring),     # 测试聊天功能监控
+    ]
     
-    # 测试性能监控
-    results['performance_monitor'] = test_performance_monitor()
-    
-    # 测试监控API
-    results['monitoring_api'] = test_monitoring_api()
-    
-    # 测试聊天功能监控
-    results['chat_monitoring'] = test_chat_with_monitoring()
+    results = {}
+    for name, test_func in tests:
+        try:
+            results[name] = test_func()
+        except Exception:
+            # 未预期的异常输出完整堆栈并记为失败，其余测试和报告照常进行
+            logger.exception(f"{name} 测试出现未预期的异常")
+            results[name] = False
     
     # 生成测试报告
     generate_test_report(results)
@@ -7,6 +7,7 @@
 
 import sys
 import os
+import importlib.util
 
 def test_app_import():
     """测试应用导入"""
@@ -45,21 +46,22 @@ def test_flask_routes():
 def test_dependencies():
     """测试关键依赖"""
     print("\n🔍 测试关键依赖...")
+    # (安装包名, 导入模块名)
     dependencies = [
-        'flask',
-        'gunicorn', 
-        'openai',
-        'pandas',
-        'scikit-learn'
+        ('flask', 'flask'),
+        ('gunicorn', 'gunicorn'),
+        ('openai', 'openai'),
+        ('pandas', 'pandas'),
+        ('scikit-learn', 'sklearn')
     ]
     
     all_ok = True
-    for dep in dependencies:
-        try:
-            __import__(dep)
-            print(f"   ✅ {dep}")
-        except ImportError:
-            print(f"   ❌ {dep} - 未安装")
+    for package, module in dependencies:
+        # 只查找模块而不执行其初始化代码
+        if importlib.util.find_spec(module) is not None:
+            print(f"   ✅ {package}")
+        else:
+            print(f"   ❌ {package} - 未安装")
             all_ok = False
     
     return all_ok
@@ -795,33 +795,37 @@ class ChatHandler:
             response_parts.append("为您推荐几款我们这里的优选好物：")
 
         recommended_products = [] # List of (key, details, tag)
+        recommended_keys = set() # 已推荐的产品键，与 recommended_products 同步维护，用于O(1)去重
         # ... (existing recommendation logic to populate recommended_products) ...
         # 使用 product_manager 的方法获取产品
         seasonal = self.product_manager.get_seasonal_products(3, target_category)
         for key, details in seasonal:
             recommended_products.append((key, details, "当季新鲜"))
+            recommended_keys.add(key)
 
         if len(recommended_products) < 3:
             popular = self.product_manager.get_popular_products(3 - len(recommended_products), target_category)
             for key, details in popular:
-                if key not in [p[0] for p in recommended_products]: # 避免重复
+                if key not in recommended_keys: # 避免重复
                     recommended_products.append((key, details, "热门好评"))
+                    recommended_keys.add(key)
 
         if len(recommended_products) < 3 and target_category:
             category_prods_all = self.product_manager.get_products_by_category(target_category, limit=10)
-            category_prods_filtered = [(k,d) for k,d in category_prods_all if k not in [p[0] for p in recommended_products]]
+            category_prods_filtered = [(k,d) for k,d in category_prods_all if k not in recommended_keys]
             needed = 3 - len(recommended_products)
             for key, details in category_prods_filtered[:needed]:
                  recommended_products.append((key, details, "精选"))
+                 recommended_keys.add(key)
 
         if not recommended_products or len(recommended_products) < 3:
             needed_fallback_count = 3 - len(recommended_products)
             potential_fallback_pool = {}
             for key, details in self.product_manager.get_seasonal_products(limit=5):
-                if key not in [p[0] for p in recommended_products] and key not in potential_fallback_pool:
+                if key not in recommended_keys and key not in potential_fallback_pool:
                     potential_fallback_pool[key] = (details, "当季推荐")
             for key, details in self.product_manager.get_popular_products(limit=5):
-                if key not in [p[0] for p in recommended_products] and key not in potential_fallback_pool:
+                if key not in recommended_keys and key not in potential_fallback_pool:
                     tag_to_use = "热门单品"
                     if key in self.product_manager.seasonal_products:
                         tag_to_use = "当季热门"
@@ -835,16 +839,18 @@ class ChatHandler:
                 if added_count >= needed_fallback_count: break
                 if details['category'] not in existing_categories_in_rec:
                     recommended_products.append((key, details, tag))
+                    recommended_keys.add(key)
                     existing_categories_in_rec.add(details['category'])
                     added_count += 1
             if added_count < needed_fallback_count:
                 for key, (details, tag) in fallback_candidates:
                     if added_count >= needed_fallback_count: break
-                    if key not in [p[0] for p in recommended_products]:
+                    if key not in recommended_keys:
                         recommended_products.append((key, details, tag))
+                        recommended_keys.add(key)
                         added_count += 1
             if len(recommended_products) < 3:
-                all_product_keys = [k for k in self.product_manager.product_catalog.keys() if k not in [p[0] for p in recommended_products]]
+                all_product_keys = [k for k in self.product_manager.product_catalog.keys() if k not in recommended_keys]
                 random.shuffle(all_product_keys)
                 for key in all_product_keys:
                     if len(recommended_products) >= 3: break
@@ -853,6 +859,7 @@ class ChatHandler:
                     if key in self.product_manager.seasonal_products: tag = "当季鲜品"
                     elif self.product_manager.popular_products.get(key,0) > 0 : tag = "人气好物"
                     recommended_products.append((key, details, tag))
+                    recommended_keys.add(key)
         # --- End of existing recommendation logic to populate recommended_products ---
 
 
@@ -1205,8 +1212,10 @@ class ChatHandler:
             temp_recs = []
             # 基于产品名关键词推荐
             if query_desc_keyword:
+                query_desc_keyword_lower = query_desc_keyword.lower()
                 for key, details in self.product_manager.product_catalog.items():
-                    if query_desc_keyword.lower() in details['name'].lower() or query_desc_keyword.lower() in key.lower():
+                    # 目录键本身已是小写
+                    if query_desc_keyword_lower in details['_name_lower'] or query_desc_keyword_lower in key:
                         if len(temp_recs) < 2: # 最多2个直接相关
                             temp_recs.append((key, details, f"与'{query_desc_keyword}'相关"))
                         else:
@@ -1375,7 +1384,7 @@ class ChatHandler:
             if not query_for_matching:
                 query_for_matching = user_input_processed
 
-            logger.debug(f"清洗后的查询，用于模糊匹配: '{query_for_matching}' (原始: '{user_input_processed}')")
+            logger.debug("清洗后的查询，用于模糊匹配: '%s' (原始: '%s')", query_for_matching, user_input_processed)
             # --- 修改结束 ---
 
             possible_matches = self.product_manager.fuzzy_match_product(query_for_matching) # 使用清洗后的查询
@@ -1636,7 +1645,7 @@ class ChatHandler:
             new_general_context_key = None
             new_bot_mention_payload_for_next_turn = None
         
-        logger.debug(f"handle_price_or_buy is about to return: intent_handled={intent_handled}, final_response_type={type(final_response)}")
+        logger.debug("handle_price_or_buy is about to return: intent_handled=%s, final_response_type=%s", intent_handled, type(final_response))
         return final_response, intent_handled, new_general_context_key, new_bot_mention_payload_for_next_turn
 
     def handle_llm_fallback(self, user_input: str, user_input_processed: str, user_id: str) -> Tuple[Union[str, Dict[str, Any]], Optional[Dict]]:
@@ -1718,10 +1727,11 @@ class ChatHandler:
                     last_product_category = session['last_product_details'].get('category')
                     last_product_key_ctx = session['last_product_details'].get('original_display_name', '').lower()
                     if last_product_category:
+                        last_product_category_lower = last_product_category.lower()
                         for key, details in self.product_manager.product_catalog.items():
                             if len(relevant_items_for_llm) >= MAX_LLM_CONTEXT_ITEMS // 2: break
                             if key == last_product_key_ctx: continue
-                            if details.get('category', '').lower() == last_product_category.lower():
+                            if details.get('_category_lower', '') == last_product_category_lower:
                                 if key not in added_product_keys:
                                     relevant_items_for_llm.append(details)
                                     added_product_keys.add(key)
@@ -1729,9 +1739,10 @@ class ChatHandler:
                 # 2. 基于用户查询中识别的类别添加产品
                 user_asked_category_name = self.product_manager.find_related_category(user_input)
                 if user_asked_category_name and len(relevant_items_for_llm) < MAX_LLM_CONTEXT_ITEMS:
+                    user_asked_category_lower = user_asked_category_name.lower()
                     for key, cat_details in self.product_manager.product_catalog.items():
                         if len(relevant_items_for_llm) >= MAX_LLM_CONTEXT_ITEMS: break
-                        if cat_details.get('category', '').lower() == user_asked_category_name.lower():
+                        if cat_details.get('_category_lower', '') == user_asked_category_lower:
                             if key not in added_product_keys:
                                 relevant_items_for_llm.append(cat_details)
                                 added_product_keys.add(key)
@@ -1747,7 +1758,7 @@ class ChatHandler:
                         if key in added_product_keys: continue
                         
                         # 检查产品名称和关键词
-                        product_words = set(re.findall(r'[\w\u4e00-\u9fff]+', details['name'].lower()))
+                        product_words = set(re.findall(r'[\w\u4e00-\u9fff]+', details['_name_lower']))
                         product_words.update(details.get('keywords', []))
                         
                         # 计算匹配度
@@ -1,9 +1,15 @@
 import logging
 import os
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# BERT输入的最大长度
+_BERT_MAX_LENGTH = 128
+# 为这几种固定序列长度分别trace计算图；预测时输入只填充到能容纳它的最短长度，
+# 短查询不必承担按最大长度计算注意力和前馈层的开销
+_BERT_TRACE_LENGTHS = (32, 64, _BERT_MAX_LENGTH)
+
 class IntentClassifier:
     """
     意图分类器：优先使用轻量级分类器，混合分类器作为备选，BERT作为最后备选
@@ -21,6 +27,9 @@ class IntentClassifier:
         self.model = None
         self.tokenizer = None
         self.label_map = None
+        self.id_to_label = None
+        self._torch = None  # 仅在加载BERT模型时才导入torch
+        self._traced_models = {}  # {序列长度: trace后的模型}，trace失败时为空
         self.lightweight_classifier = None
         self.hybrid_classifier = None
         self._models_loaded = False
@@ -66,12 +75,17 @@ class IntentClassifier:
             return
 
         try:
-            # 懒加载重型库
-            from transformers import BertForSequenceClassification, BertTokenizer
+            # 懒加载重型库，只有真正回退到BERT时才导入torch/transformers
+            import torch
+            from transformers import BertForSequenceClassification, BertTokenizerFast
+            self._torch = torch
 
             logger.info(f"正在加载BERT模型从 '{self.model_path}'...")
-            self.model = BertForSequenceClassification.from_pretrained(self.model_path)
-            self.tokenizer = BertTokenizer.from_pretrained(self.model_path)
+            self.tokenizer = BertTokenizerFast.from_pretrained(self.model_path)
+            model = self._quantize_model(BertForSequenceClassification.from_pretrained(self.model_path))
+            self.model = model
+            # trace时的示例分词同时触发了Rust分词库的初始化，避免首个请求承担该开销
+            self._traced_models = self._trace_model(model)
             
             # 加载标签映射
             import json
@@ -84,6 +98,10 @@ class IntentClassifier:
                 self.model = None # 加载失败
 
             if self.model and self.tokenizer and self.label_map:
+                # 预先反转标签映射 {"label": id} 为按ID索引的列表，避免每次预测时重建
+                self.id_to_label = [None] * (max(self.label_map.values()) + 1)
+                for label, label_id in self.label_map.items():
+                    self.id_to_label[label_id] = label
                 logger.info("BERT意图分类模型加载成功。")
 
         except Exception as e:
@@ -91,6 +109,44 @@ class IntentClassifier:
             self.model = None
             self.tokenizer = None
             self.label_map = None
+            self.id_to_label = None
+
+    def _quantize_model(self, model):
+        """
+        对BERT模型的全部 nn.Linear 层做动态int8量化，减少CPU推理时的权重带宽。
+        量化失败时返回原始FP32模型。
+        """
+        torch = self._torch
+        try:
+            quantized_model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            quantized_model.eval()
+            logger.info("BERT模型已完成动态int8量化。")
+            return quantized_model
+        except Exception as e:
+            logger.warning(f"BERT模型int8量化失败: {e}，将使用FP32模型")
+            model.eval()
+            return model
+
+    def _trace_model(self, model):
+        """
+        用 torch.jit.trace 将模型固化为计算图，推理时不再逐个算子经过Python解释器。
+        对 _BERT_TRACE_LENGTHS 中的每个序列长度各trace一次，返回 {序列长度: trace后的模型}；
+        trace失败时返回空字典，预测时使用eager模型。
+        """
+        torch = self._torch
+        try:
+            traced_models = {}
+            with torch.no_grad():
+                for length in _BERT_TRACE_LENGTHS:
+                    example = self.tokenizer("预热", return_tensors="pt", truncation=True,
+                                             padding="max_length", max_length=length)
+                    traced_models[length] = torch.jit.trace(
+                        model, (example['input_ids'], example['attention_mask']), strict=False)
+            logger.info(f"BERT模型已通过 torch.jit.trace 固化为计算图，序列长度: {list(traced_models)}")
+            return traced_models
+        except Exception as e:
+            logger.warning(f"BERT模型trace失败: {e}，将使用eager模式")
+            return {}
 
     def predict(self, text: str) -> str:
         """
@@ -102,10 +158,42 @@ class IntentClassifier:
         Returns:
             str: 预测的意图标签。如果模型未加载，则返回 'unknown'。
         """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: List[str]) -> List[str]:
+        """
+        批量预测多条文本的意图。
+
+        轻量级/混合分类器逐条处理；需要回退到BERT的文本会合并为一次前向计算，
+        以分摊分词和模型调度的开销。
+
+        Args:
+            texts (List[str]): 用户输入的文本列表。
+
+        Returns:
+            List[str]: 与输入顺序一致的意图标签列表。
+        """
         # 确保模型已加载（懒加载）
         if self.lazy_load:
             self._ensure_models_loaded()
 
+        results: List[Optional[str]] = [None] * len(texts)
+        bert_indices = []
+        for i, text in enumerate(texts):
+            result = self._predict_with_fallback_classifiers(text)
+            if result is None:
+                bert_indices.append(i)
+            else:
+                results[i] = result
+
+        if bert_indices:
+            bert_results = self._bert_predict_batch([texts[i] for i in bert_indices])
+            for i, result in zip(bert_indices, bert_results):
+                results[i] = result
+        return results
+
+    def _predict_with_fallback_classifiers(self, text: str) -> Optional[str]:
+        """使用轻量级/混合分类器预测，均不可用时返回 None 以交由BERT处理"""
         # 优先使用轻量级分类器
         if self.lightweight_classifier:
             try:
@@ -124,35 +212,55 @@ class IntentClassifier:
             except Exception as e:
                 logger.warning(f"混合分类器预测失败: {e}，回退到BERT模型")
 
-        # 最后回退到BERT模型
-        if not self.model or not self.tokenizer or not self.label_map:
+        return None
+
+    def _bert_predict_batch(self, texts: List[str]) -> List[str]:
+        """使用BERT模型对一批文本进行单次前向计算"""
+        if not self.model or not self.tokenizer or not self.id_to_label:
             logger.warning("所有意图分类器都不可用，返回 'unknown'。")
-            return 'unknown'
+            return ['unknown'] * len(texts)
 
+        torch = self._torch
         try:
-            # 懒加载torch
-            import torch
-
-            # 准备输入
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=128)
+            # 准备输入（批量填充到同一长度；单条文本无需填充）
+            # 模型只使用 input_ids 和 attention_mask，不再生成用不到的 token_type_ids
+            inputs = self.tokenizer(texts, return_tensors="pt", truncation=True, padding=len(texts) > 1,
+                                    max_length=_BERT_MAX_LENGTH, return_token_type_ids=False)
+            input_ids = inputs['input_ids']
+            attention_mask = inputs['attention_mask']
 
-            # 模型预测
-            with torch.no_grad():
-                outputs = self.model(**inputs)
+            model = self.model
+            if self._traced_models:
+                # 选用能容纳当前序列的最短trace长度，只补齐到该长度
+                seq_len = input_ids.shape[1]
+                length = next(n for n in _BERT_TRACE_LENGTHS if n >= seq_len)
+                model = self._traced_models[length]
+                if length > seq_len:
+                    pad = (0, length - seq_len)
+                    input_ids = torch.nn.functional.pad(input_ids, pad, value=self.tokenizer.pad_token_id)
+                    attention_mask = torch.nn.functional.pad(attention_mask, pad, value=0)
 
-            logits = outputs.logits
-            predicted_class_id = torch.argmax(logits, dim=1).item()
+            # 模型预测；inference_mode 比 no_grad 额外跳过了视图/版本计数追踪
+            with torch.inference_mode():
+                outputs = model(input_ids, attention_mask)
 
-            # 将ID转换回标签
-            # label_map 的格式是 {"label": id}, 我们需要反转它
-            id_to_label = {v: k for k, v in self.label_map.items()}
+            # eager模型返回 ModelOutput，trace后的模型返回dict或tuple
+            logits = outputs['logits'] if isinstance(outputs, dict) else outputs[0]
+            predicted_class_ids = torch.argmax(logits, dim=1).tolist()
 
-            result = id_to_label.get(predicted_class_id, 'unknown')
-            logger.debug(f"BERT模型预测: '{text}' -> {result}")
-            return result
+            # 将ID转换回标签（id_to_label 在加载模型时已预先构建）
+            results = []
+            for text, predicted_class_id in zip(texts, predicted_class_ids):
+                if 0 <= predicted_class_id < len(self.id_to_label):
+                    result = self.id_to_label[predicted_class_id] or 'unknown'
+                else:
+                    result = 'unknown'
+                logger.debug(f"BERT模型预测: '{text}' -> {result}")
+                results.append(result)
+            return results
         except Exception as e:
             logger.error(f"BERT模型预测失败: {e}")
-            return 'unknown'
+            return ['unknown'] * len(texts)
 
     def get_prediction_confidence(self, text: str) -> Tuple[str, float]:
         """
@@ -359,6 +359,31 @@ class LightweightIntentClassifier:
             logger.warning(f"ML分类失败: {e}")
             return None, 0.0
 
+    def _ml_classify_batch(self, texts: List[str]) -> List[Tuple[Optional[str], float]]:
+        """批量ML分类：一次完成特征提取和概率计算，结果与逐条调用 _ml_classify 相同"""
+        if not texts:
+            return []
+        if not self.tfidf_model or not self.nb_model or not self.label_encoder:
+            return [(None, 0.0)] * len(texts)
+            
+        try:
+            # 一次性提取所有文本的特征，得到稀疏矩阵
+            tfidf_features = self.tfidf_model.transform(texts)
+            
+            # 一次矩阵运算得到所有文本的类别概率
+            probabilities = self.nb_model.predict_proba(tfidf_features)
+            best_indices = probabilities.argmax(axis=1)
+            confidences = probabilities.max(axis=1)
+            
+            # 批量解码标签
+            intents = self.label_encoder.inverse_transform(self.nb_model.classes_[best_indices])
+            
+            return [(intent, float(confidence)) for intent, confidence in zip(intents, confidences)]
+            
+        except Exception as e:
+            logger.warning(f"批量ML分类失败: {e}")
+            return [(None, 0.0)] * len(texts)
+
     def _keyword_classify(self, text: str) -> Optional[str]:
         """基于关键词的分类（兜底策略）"""
         text_lower = text.lower()
@@ -412,6 +437,46 @@ class LightweightIntentClassifier:
         # 最后兜底
         return 'unknown'
 
+    def predict_batch(self, texts: List[str]) -> List[str]:
+        """
+        批量预测意图，结果与逐条调用 predict 相同。
+        规则匹配逐条进行，未命中规则的文本一起送入ML模型，
+        用一次矩阵运算代替逐条的特征提取和预测。
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        pending_indices = []
+        pending_texts = []
+
+        # 第一层：规则匹配
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = 'unknown'
+                continue
+            text = text.strip()
+            rule_result = self._rule_based_classify(text)
+            if rule_result:
+                results[i] = rule_result
+            else:
+                pending_indices.append(i)
+                pending_texts.append(text)
+
+        if not pending_texts:
+            return results
+
+        # 确保模型已加载（懒加载）
+        if self.lazy_load:
+            self._ensure_model_loaded()
+
+        # 第二层：轻量级ML模型（批量）；第三层：关键词匹配
+        ml_results = self._ml_classify_batch(pending_texts)
+        for i, text, (ml_result, confidence) in zip(pending_indices, pending_texts, ml_results):
+            if ml_result and confidence > 0.3:  # 置信度阈值
+                results[i] = ml_result
+            else:
+                results[i] = self._keyword_classify(text) or 'unknown'
+
+        return results
+
     def get_prediction_confidence(self, text: str) -> Tuple[str, float]:
         """获取预测结果和置信度"""
         intent = self.predict(text)
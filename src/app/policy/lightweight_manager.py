@@ -288,13 +288,7 @@ class LightweightPolicyManager:
             # 计算余弦相似度
             similarities = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
             
-            # 获取最相似的句子
-            top_indices = similarities.argsort()[-top_k:][::-1]
-            
-            relevant_sentences = []
-            for idx in top_indices:
-                if similarities[idx] > 0.1:  # 相似度阈值
-                    relevant_sentences.append(self.policy_sentences[idx])
+            relevant_sentences = self._top_tfidf_sentences(similarities, top_k)
             
             if relevant_sentences:
                 logger.debug(f"TF-IDF搜索找到 {len(relevant_sentences)} 条政策")
@@ -305,6 +299,40 @@ class LightweightPolicyManager:
             logger.error(f"TF-IDF搜索失败: {e}")
             return []
 
+    def search_policy_by_tfidf_batch(self, queries: List[str], top_k: int = 3) -> List[List[str]]:
+        """批量TF-IDF政策搜索：所有查询一起向量化，一次矩阵乘法算出全部相似度"""
+        if not queries:
+            return []
+
+        if not self._model_loaded:
+            self._ensure_tfidf_loaded()
+        
+        if not self.tfidf_vectorizer or self.tfidf_matrix is None:
+            return [[] for _ in queries]
+        
+        try:
+            from sklearn.metrics.pairwise import cosine_similarity
+            
+            # 查询矩阵（每行一个查询）与政策句子矩阵的余弦相似度
+            query_matrix = self.tfidf_vectorizer.transform(queries)
+            similarities = cosine_similarity(query_matrix, self.tfidf_matrix)
+            
+            return [self._top_tfidf_sentences(row, top_k) for row in similarities]
+            
+        except Exception as e:
+            logger.error(f"批量TF-IDF搜索失败: {e}")
+            return [[] for _ in queries]
+
+    def _top_tfidf_sentences(self, similarities, top_k: int) -> List[str]:
+        """从一行相似度中取出超过阈值的最相似句子"""
+        top_indices = similarities.argsort()[-top_k:][::-1]
+        
+        relevant_sentences = []
+        for idx in top_indices:
+            if similarities[idx] > 0.1:  # 相似度阈值
+                relevant_sentences.append(self.policy_sentences[idx])
+        return relevant_sentences
+
     def search_policy_by_fuzzy(self, query: str, top_k: int = 3) -> List[str]:
         """基于模糊匹配的政策搜索（兜底策略）"""
         query_lower = query.lower()
@@ -364,6 +392,41 @@ class LightweightPolicyManager:
         # 如果都没找到，返回通用政策信息
         return self._get_general_policy_info()
 
+    def search_policy_batch(self, queries: List[str], top_k: int = 3) -> List[List[str]]:
+        """
+        批量搜索政策，结果与逐条调用 search_policy 相同。
+        关键词匹配逐条进行，未命中的查询一起进行TF-IDF搜索。
+        """
+        results: List[Optional[List[str]]] = [None] * len(queries)
+        pending_indices = []
+        pending_queries = []
+
+        # 第一层：关键词匹配
+        for i, query in enumerate(queries):
+            if not query or not query.strip():
+                results[i] = []
+                continue
+            keyword_results = self.search_policy_by_keywords(query, top_k)
+            if keyword_results:
+                results[i] = keyword_results
+            else:
+                pending_indices.append(i)
+                pending_queries.append(query)
+
+        if not pending_queries:
+            return results
+
+        # 第二层：TF-IDF搜索（批量）；第三层：模糊匹配；最后返回通用政策信息
+        tfidf_results = self.search_policy_by_tfidf_batch(pending_queries, top_k)
+        for i, query, tfidf_result in zip(pending_indices, pending_queries, tfidf_results):
+            results[i] = (
+                tfidf_result
+                or self.search_policy_by_fuzzy(query, top_k)
+                or self._get_general_policy_info()
+            )
+
+        return results
+
     def _get_general_policy_info(self) -> List[str]:
         """获取通用政策信息"""
         general_info = self.keyword_index.get('general', {}).get('sentences', [])
@@ -1,6 +1,7 @@
 import os
 import json
 import logging
+from bisect import bisect_right
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,9 @@ class PolicyManager:
         self.policy_file = policy_file
         self.policy_data: Dict[str, Any] = {}
         self.policy_sentences: List[str] = []
+        # 关键词检索索引：所有小写句子以换行拼接成的文本及每句的起始偏移
+        self._sentences_lower_blob = ''
+        self._sentence_offsets: List[int] = []
         self.policy_embeddings = None
         self.model_name = model_name
         self.model: Optional[Any] = None  # SentenceTransformer model (heavy)
@@ -75,6 +79,26 @@ class PolicyManager:
             self.policy_data = {}
             self.policy_sentences = []
 
+        self._build_sentence_index()
+
+    def _build_sentence_index(self):
+        """Builds the lowercase sentence blob used by find_policy_excerpt.
+
+        Each keyword lookup becomes a single str.find over the blob plus a
+        bisect on the sentence offsets, instead of lower-casing and scanning
+        every sentence per keyword.
+        """
+        offsets = []
+        position = 0
+        lowered = []
+        for sentence in self.policy_sentences:
+            sentence_lower = sentence.lower()
+            offsets.append(position)
+            lowered.append(sentence_lower)
+            position += len(sentence_lower) + 1  # +1 for the '\n' separator
+        self._sentences_lower_blob = '\n'.join(lowered)
+        self._sentence_offsets = offsets
+
     def _ensure_model_loaded(self):
         """确保模型已加载（懒加载）"""
         if not self._model_loaded:
@@ -289,10 +313,18 @@ class PolicyManager:
         
         # If policy_data was loaded, use the extracted sentences
         if self.policy_sentences:
-             for kw in keywords:
-                for sentence in self.policy_sentences:
-                    if kw.lower() in sentence.lower():
-                        return sentence
+            for kw in keywords:
+                kw_lower = kw.lower()
+                if '\n' in kw_lower:
+                    # A keyword spanning the separator could match across sentences
+                    for sentence in self.policy_sentences:
+                        if kw_lower in sentence.lower():
+                            return sentence
+                    continue
+                # The first occurrence in the blob lies in the first matching sentence
+                match_pos = self._sentences_lower_blob.find(kw_lower)
+                if match_pos != -1:
+                    return self.policy_sentences[bisect_right(self._sentence_offsets, match_pos) - 1]
         # If policy_data failed to load, self.policy_sentences is empty,
         # so the loops above won't run. Return empty string.
         return ''
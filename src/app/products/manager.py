@@ -7,16 +7,99 @@ if PROJECT_ROOT not in sys.path:
 import re
 import csv
 import random
+from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Any # 新增导入，用于类型提示
 import logging
 from src.config import settings as config
 from src.core.cache import CacheManager, cached
-from pypinyin import pinyin, Style
+from pypinyin import pinyin, lazy_pinyin, Style
 import Levenshtein # 新增导入
+import numpy as np
+
+# rapidfuzz 随 Levenshtein 一起安装；Indel 归一化相似度即 Levenshtein.ratio，可对整批候选一次计算
+try:
+    from rapidfuzz.process import cdist as _cdist
+    from rapidfuzz.distance.Indel import normalized_similarity as _indel_similarity
+except ImportError:
+    _cdist = None
+    _indel_similarity = None
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# _tokenize 使用的预编译正则
+_ALNUM_RE = re.compile(r'[A-Za-z0-9]+')
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]+')
+
+@lru_cache(maxsize=4096)
+def _tokenize_cached(text: str) -> Tuple[str, ...]:
+    """对已转为小写的文本分词：字母数字词 + 中文单字 + 中文二元组（结果按文本缓存）"""
+    tokens = _ALNUM_RE.findall(text)
+    for seq in _CJK_RE.findall(text):
+        tokens.extend(seq)
+        tokens.extend(seq[i:i+2] for i in range(len(seq) - 1))
+    return tuple(tokens)
+
+def _compile_keyword_pattern(keywords):
+    """将关键词列表编译为单个正则交替式，一次扫描即可判断查询是否包含其中任一关键词"""
+    escaped = [re.escape(kw) for kw in sorted(set(keywords), key=len, reverse=True) if kw]
+    return re.compile('|'.join(escaped)) if escaped else None
+
+# find_related_category 第5步使用的通用词汇
+_GENERIC_FRUIT_WORDS_RE = _compile_keyword_pattern(["吃", "食", "鲜", "甜", "新鲜", "水果", "果"])
+_GENERIC_VEGETABLE_WORDS_RE = _compile_keyword_pattern(["菜", "素", "绿色", "蔬菜", "青菜"])
+
+def _build_chinese_number_table() -> Dict[str, int]:
+    """生成 convert_chinese_number_to_int 支持的全部中文数字写法到整数的映射（零到九十九）"""
+    digits = {'零': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
+              '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+    table = dict(digits)
+    # 十到九十九："[一二两三四五六七八九]?十[一二三四五六七八九]?"，十位省略时为1
+    tens_digits = [(None, 1)] + [(char, value) for char, value in digits.items() if value > 0]
+    ones_digits = [(None, 0)] + [(char, value) for char, value in digits.items() if value > 0 and char != '两']
+    for tens_char, tens in tens_digits:
+        for ones_char, ones in ones_digits:
+            table[f"{tens_char or ''}十{ones_char or ''}"] = tens * 10 + ones
+    return table
+
+_CN_NUMBER_TABLE = _build_chinese_number_table()
+
+@lru_cache(maxsize=4096)
+def _pinyin_text(text: str) -> str:
+    """文本的空格分隔无声调拼音，供拼音相似度比较（结果按文本缓存）"""
+    return ' '.join(lazy_pinyin(text))
+
+# IsSeasonal 列中表示"是"的取值（小写）
+_SEASONAL_TRUE_VALUES = ['true', 'yes', '1', 'y']
+
+# 随产品快照缓存的匹配索引属性；结构变化时递增版本号，使旧快照中的索引被重建
+_MATCH_INDEX_ATTRS = ('_match_features', '_char_index', '_product_order', '_name_trie', '_char_bits', '_keyword_bits')
+_MATCH_INDEX_VERSION = 1
+
+# 名称trie中存放产品键列表的特殊键（空字符串不会与任何单个字符冲突）
+_TRIE_KEYS = ''
+
+def _to_bits(items, bit_map) -> int:
+    """将集合编码为位图，bit_map 中没有的元素被忽略"""
+    bits = 0
+    for item in items:
+        bits |= bit_map.get(item, 0)
+    return bits
+
+# 位图中1的个数：int.bit_count 需要 Python 3.10+，更早的版本退回 bin().count('1')
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(bits: int) -> int:
+        return bin(bits).count('1')
+
+def _bit_jaccard(bits1: int, size1: int, bits2: int, size2: int) -> float:
+    """由两个集合的位图和元素个数计算Jaccard相似度：交集用 popcount 计数，并集由容斥原理得出"""
+    intersection = _popcount(bits1 & bits2)
+    union = size1 + size2 - intersection
+    return intersection / union if union > 0 else 0
+
 class ProductManager:
     """产品管理类，处理产品数据加载、搜索、推荐等功能"""
     
@@ -32,6 +115,35 @@ class ProductManager:
         self.all_product_keywords = []
         self.seasonal_products = []
         self.popular_products = {}
+        # 模糊匹配用的每个产品预计算特征 {product_key: {...}}
+        self._match_features = {}
+        # 字符倒排索引 {字符: {product_key, ...}}，用于缩小模糊匹配的候选集
+        self._char_index = {}
+        # 产品在目录中的顺序，保证候选集打分后的结果顺序与全量扫描一致
+        self._product_order = {}
+        # 小写产品名称的字符trie（嵌套dict，_TRIE_KEYS 处存放以该路径为名称的产品键）
+        self._name_trie = {}
+        # 字符/关键词到比特位的映射，用于位图形式的Jaccard计算
+        self._char_bits = {}
+        self._keyword_bits = {}
+        # 小写类别名到产品键列表的索引（按目录顺序），供按类别批量查询使用
+        self._category_key_index = {}
+        # 热度不为0的产品键；热度排序只需对这些产品排序，其余产品保持目录顺序
+        self._nonzero_popularity_keys = set()
+        # 类别推断第2步用的 (类别名, 小写类别名) 列表及其预编译正则
+        self._category_names_lower = []
+        self._category_name_re = None
+        # 类别推断第6步用的类别名字符位图 [(类别名, 位图)] 及字符到比特位的映射
+        self._category_char_bits = []
+        self._category_char_bit_map = {}
+
+        # 类别推断用的预编译关键词正则
+        self._fruit_keyword_re = _compile_keyword_pattern(config.FRUIT_KEYWORDS)
+        self._vegetable_keyword_re = _compile_keyword_pattern(config.VEGETABLE_KEYWORDS)
+        self._category_keyword_res = {
+            cat: _compile_keyword_pattern(keywords_list)
+            for cat, keywords_list in config.CATEGORY_KEYWORD_MAP.items()
+        }
 
         # 缓存管理器
         self.cache_manager = cache_manager or CacheManager()
@@ -59,11 +171,16 @@ class ProductManager:
         # 移除路径修改逻辑，直接使用传入的 file_path，期望它是正确的路径
         # (例如，config.PRODUCT_DATA_FILE 应为 "data/products.csv")
 
-        # 尝试从缓存加载
-        cached_data = self.cache_manager.get_cached_product_data()
+        # 尝试从缓存加载（以源文件签名校验，CSV变化后自动失效）
+        source_signature = self._get_source_signature(file_path)
+        cached_data = self.cache_manager.get_cached_product_data(source_signature=source_signature)
         if cached_data:
-            self.product_catalog, self.product_categories, self.seasonal_products = cached_data
-            self.all_product_keywords = self._extract_all_keywords()
+            self.product_catalog, self.product_categories, self.seasonal_products, extra_data = cached_data
+            self.all_product_keywords = extra_data.get('all_product_keywords') or self._extract_all_keywords()
+            # 快照中带有匹配索引时直接恢复，省去逐个产品转换拼音等重建开销
+            if not self._restore_match_index(extra_data.get('match_index')):
+                self._build_match_index()
+            self._build_category_index()
             logger.info(f"从缓存加载产品数据完成，共 {len(self.product_catalog)} 条产品规格")
             return True
             
@@ -77,131 +194,86 @@ class ProductManager:
         expected_headers = ['ProductName', 'Specification', 'Price', 'Unit', 'Category', 'Description', 'IsSeasonal', 'Keywords', 'Taste', 'Origin', 'Benefits', 'SuitableFor'] # 保持与文档一致
         
         try:
-            with open(file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                logger.debug(f"CSV Headers read by DictReader: {reader.fieldnames}")
-                
-                # 检查是否有必要的列，并创建列名映射
-                fieldnames_clean = [fn.strip() for fn in (reader.fieldnames or [])]
-                fieldnames_lower = [fn.lower() for fn in fieldnames_clean]
-
-                # 创建原始列名到清理后列名的映射
-                column_mapping = {}
-                for original, clean in zip(reader.fieldnames or [], fieldnames_clean):
-                    column_mapping[clean] = original
-
-                has_description = 'description' in fieldnames_lower
-                has_seasonal = 'isseasonal' in fieldnames_lower
-                has_keywords = 'keywords' in fieldnames_lower
-                has_taste = 'taste' in fieldnames_lower
-                has_origin = 'origin' in fieldnames_lower
-                has_benefits = 'benefits' in fieldnames_lower
-                has_suitablefor = 'suitablefor' in fieldnames_lower
-
-                # Ensure basic columns are present, checking against lowercased fieldnames for robustness
-                required_cols_lower = ['productname', 'specification', 'price', 'unit', 'category']
-                if not reader.fieldnames or not all(col_req.lower() in fieldnames_lower for col_req in required_cols_lower):
-                    logger.error(f"CSV文件 {file_path} 的基本列标题不正确。必须包含: ProductName, Specification, Price, Unit, Category (大小写不敏感)")
-                    logger.error(f"实际列名: {fieldnames_clean}")
-                    return False
-                
-                for row_num, row in enumerate(reader, 1):
-                    try:
-                        # 使用映射来访问列，处理列名中的空格问题
-                        product_name = row[column_mapping['ProductName']].strip()
-                        specification = row[column_mapping['Specification']].strip()
-                        price_str = row[column_mapping['Price']].strip()
-                        unit = row[column_mapping['Unit']].strip()
-                        category = row[column_mapping['Category']].strip()
-
-                        # 读取可选列，使用安全的方式
-                        description = ""
-                        if has_description:
-                            desc_key = column_mapping.get('Description')
-                            if desc_key and desc_key in row:
-                                description = row[desc_key].strip()
-
-                        is_seasonal = False
-                        if has_seasonal:
-                            seasonal_key = column_mapping.get('IsSeasonal')
-                            if seasonal_key and seasonal_key in row:
-                                is_seasonal_str = row[seasonal_key].strip().lower()
-                                is_seasonal = is_seasonal_str in ['true', 'yes', '1', 'y']
-
-                        keywords = []
-                        if has_keywords:
-                            keywords_key = column_mapping.get('Keywords')
-                            if keywords_key and keywords_key in row:
-                                keywords_text = row[keywords_key].strip()
-                                keywords = [k.lower() for k in re.split(r'[;,\s]+', keywords_text) if k.strip()]
-
-                        # 新增: 读取多维度标签
-                        taste = ""
-                        if has_taste:
-                            taste_key = column_mapping.get('Taste')
-                            if taste_key and taste_key in row:
-                                taste = row[taste_key].strip()
-
-                        origin = ""
-                        if has_origin:
-                            origin_key = column_mapping.get('Origin')
-                            if origin_key and origin_key in row:
-                                origin = row[origin_key].strip()
-
-                        benefits = ""
-                        if has_benefits:
-                            benefits_key = column_mapping.get('Benefits')
-                            if benefits_key and benefits_key in row:
-                                benefits = row[benefits_key].strip()
-
-                        suitablefor = ""
-                        if has_suitablefor:
-                            suitablefor_key = column_mapping.get('SuitableFor')
-                            if suitablefor_key and suitablefor_key in row:
-                                suitablefor = row[suitablefor_key].strip()
-
-                        if not product_name or not price_str or not specification or not unit or not category:
-                            logger.warning(f"CSV文件第 {row_num+1} 行数据不完整，已跳过: {row}")
-                            continue
-                        
-                        price = float(price_str)
-                        unique_product_key = product_name
-                        if specification and specification.lower() != unit.lower() and specification not in product_name:
-                            unique_product_key = f"{product_name} ({specification})"
-                        
-                        self.product_catalog[unique_product_key.lower()] = {
-                            'name': product_name,
-                            'specification': specification,
-                            'price': price,
-                            'unit': unit,
-                            'category': category,
-                            'original_display_name': unique_product_key,
-                            'description': description,
-                            'is_seasonal': is_seasonal,
-                            'keywords': keywords,
-                            'popularity': 0,
-                            # 新增: 存储多维度标签
-                            'taste': taste,
-                            'origin': origin,
-                            'benefits': benefits,
-                            'suitablefor': suitablefor
-                        }
-                        
-                        # 记录季节性产品
-                        if is_seasonal:
-                            self.seasonal_products.append(unique_product_key.lower())
-                            
-                        # 构建类别索引
-                        if category not in self.product_categories:
-                            self.product_categories[category] = []
-                        self.product_categories[category].append(unique_product_key.lower())
+            columns = self._read_product_columns(file_path)
+            logger.debug(f"CSV Headers read: {list(columns)}")
+
+            # Ensure basic columns are present, checking against lowercased fieldnames for robustness
+            required_cols_lower = ['productname', 'specification', 'price', 'unit', 'category']
+            if not columns or not all(col_req in columns for col_req in required_cols_lower):
+                logger.error(f"CSV文件 {file_path} 的基本列标题不正确。必须包含: ProductName, Specification, Price, Unit, Category (大小写不敏感)")
+                logger.error(f"实际列名: {list(columns)}")
+                return False
+
+            row_count = len(columns['productname'])
+            empty_column = [""] * row_count
+            # 关键词拆分和季节性标记按整列解析
+            keyword_lists, seasonal_flags = self._parse_keyword_and_seasonal_columns(
+                columns.get('keywords', empty_column), columns.get('isseasonal', empty_column))
+            # 可选列不存在时按空字符串处理
+            rows = zip(
+                columns['productname'], columns['specification'], columns['price'],
+                columns['unit'], columns['category'],
+                columns.get('description', empty_column),
+                seasonal_flags,
+                keyword_lists,
+                columns.get('taste', empty_column),
+                columns.get('origin', empty_column),
+                columns.get('benefits', empty_column),
+                columns.get('suitablefor', empty_column)
+            )
+
+            for row_num, row in enumerate(rows, 1):
+                try:
+                    # 各列已在 _read_product_columns 中批量 strip
+                    product_name, specification, price_str, unit, category, description, is_seasonal, keywords = row[:8]
+                    # 新增: 读取多维度标签
+                    taste, origin, benefits, suitablefor = row[8:12]
+
+                    if not product_name or not price_str or not specification or not unit or not category:
+                        logger.warning(f"CSV文件第 {row_num+1} 行数据不完整，已跳过: {row}")
+                        continue
+                    
+                    price = float(price_str)
+                    unique_product_key = product_name
+                    if specification and specification.lower() != unit.lower() and specification not in product_name:
+                        unique_product_key = f"{product_name} ({specification})"
+                    
+                    self.product_catalog[unique_product_key.lower()] = {
+                        'name': product_name,
+                        'specification': specification,
+                        'price': price,
+                        'unit': unit,
+                        'category': category,
+                        'original_display_name': unique_product_key,
+                        'description': description,
+                        'is_seasonal': is_seasonal,
+                        'keywords': keywords,
+                        'popularity': 0,
+                        # 新增: 存储多维度标签
+                        'taste': taste,
+                        'origin': origin,
+                        'benefits': benefits,
+                        'suitablefor': suitablefor,
+                        # 加载时缓存小写形式，查询时无需反复调用 lower()
+                        '_name_lower': product_name.lower(),
+                        '_category_lower': category.lower()
+                    }
+                    
+                    # 记录季节性产品
+                    if is_seasonal:
+                        self.seasonal_products.append(unique_product_key.lower())
                         
-                    except ValueError as ve:
-                        logger.warning(f"CSV文件第 {row_num+1} 行价格格式错误，已跳过: {row} - {ve}")
-                    except KeyError as ke:
-                        logger.warning(f"CSV文件第 {row_num+1} 行缺少必要的列，已跳过: {row} - {ke}")
-                    except Exception as e:
-                        logger.warning(f"处理CSV文件第 {row_num+1} 行时发生未知错误，已跳过: {row} - {e}")
+                    # 构建类别索引
+                    if category not in self.product_categories:
+                        self.product_categories[category] = []
+                    self.product_categories[category].append(unique_product_key.lower())
+                    
+                except ValueError as ve:
+                    logger.warning(f"CSV文件第 {row_num+1} 行价格格式错误，已跳过: {row} - {ve}")
+                except KeyError as ke:
+                    logger.warning(f"CSV文件第 {row_num+1} 行缺少必要的列，已跳过: {row} - {ke}")
+                except Exception as e:
+                    logger.warning(f"处理CSV文件第 {row_num+1} 行时发生未知错误，已跳过: {row} - {e}")
         except FileNotFoundError:
             logger.error(f"产品文件 {file_path} 未找到。请确保它在应用根目录。")
             return False
@@ -211,12 +283,19 @@ class ProductManager:
         
         # 提取所有关键词
         self.all_product_keywords = self._extract_all_keywords()
+        self._build_match_index()
+        self._build_category_index()
         
         # 缓存产品数据
         self.cache_manager.cache_product_data(
             self.product_catalog,
             self.product_categories,
-            self.seasonal_products
+            self.seasonal_products,
+            source_signature=source_signature,
+            extra_data={
+                'all_product_keywords': self.all_product_keywords,
+                'match_index': self._export_match_index()
+            }
         )
         
         if not self.product_catalog:
@@ -228,14 +307,216 @@ class ProductManager:
                 logger.info(f"当季推荐产品: {len(self.seasonal_products)} 条")
             return True
 
+    def _build_match_index(self):
+        """为模糊匹配预计算每个产品的字符位图、关键词位图和名称拼音
+
+        这些特征在加载后不再变化，预先计算后 fuzzy_match_product 每次查询
+        只需做位运算和编辑距离比较，无需为每个产品重复构建集合或转换拼音。
+        字符和关键词各自按首次出现的顺序分配一个比特位。
+        """
+        self._match_features = {}
+        self._char_index = defaultdict(set)
+        self._product_order = {}
+        self._name_trie = {}
+        self._char_bits = {}
+        self._keyword_bits = {}
+        for order, (key, details) in enumerate(self.product_catalog.items()):
+            name_chars = frozenset(details['_name_lower'])
+            keyword_set = frozenset(details.get('keywords', []))
+            for char in name_chars:
+                self._char_bits.setdefault(char, 1 << len(self._char_bits))
+            for keyword in keyword_set:
+                self._keyword_bits.setdefault(keyword, 1 << len(self._keyword_bits))
+            self._match_features[key] = {
+                'name_bits': _to_bits(name_chars, self._char_bits),
+                'name_char_count': len(name_chars),
+                'keyword_bits': _to_bits(keyword_set, self._keyword_bits),
+                'keyword_count': len(keyword_set),
+                'name_pinyin': _pinyin_text(details['_name_lower']),
+            }
+            self._product_order[key] = order
+            for char in name_chars:
+                self._char_index[char].add(key)
+            node = self._name_trie
+            for char in details['_name_lower']:
+                node = node.setdefault(char, {})
+            node.setdefault(_TRIE_KEYS, []).append(key)
+        self._char_index = dict(self._char_index)
+
+    def _export_match_index(self) -> Dict[str, Any]:
+        """导出 _build_match_index 构建的全部结构，随产品快照一起缓存"""
+        match_index = {attr: getattr(self, attr) for attr in _MATCH_INDEX_ATTRS}
+        match_index['version'] = _MATCH_INDEX_VERSION
+        return match_index
+
+    def _restore_match_index(self, match_index) -> bool:
+        """从缓存恢复匹配索引；版本不符或与当前目录不一致时返回False，由调用方重建"""
+        if not match_index or match_index.get('version') != _MATCH_INDEX_VERSION:
+            return False
+        if any(attr not in match_index for attr in _MATCH_INDEX_ATTRS):
+            return False
+        if match_index['_match_features'].keys() != self.product_catalog.keys():
+            return False
+        for attr in _MATCH_INDEX_ATTRS:
+            setattr(self, attr, match_index[attr])
+        return True
+
+    def _keys_sharing_chars(self, chars) -> List[str]:
+        """返回名称中至少包含 chars 中一个字符的产品键，按目录顺序排列"""
+        candidate_keys = set()
+        for char in set(chars):
+            candidate_keys.update(self._char_index.get(char, ()))
+        return sorted(candidate_keys, key=self._product_order.__getitem__)
+
+    def _keys_with_name_in(self, text: str) -> set:
+        """沿名称trie从 text 的每个位置向后走，返回名称作为子串出现在 text 中的产品键"""
+        matched = set()
+        trie = self._name_trie
+        for start in range(len(text)):
+            node = trie
+            for char in text[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                matched.update(node.get(_TRIE_KEYS, ()))
+        return matched
+
+    def _keys_with_name_containing(self, text: str) -> set:
+        """返回名称包含 text 的产品键：先对各字符的倒排列表求交集，再做子串校验"""
+        if not text:
+            return set(self.product_catalog)
+        postings = []
+        for char in set(text):
+            keys = self._char_index.get(char)
+            if not keys:
+                return set()
+            postings.append(keys)
+        postings.sort(key=len)
+        candidate_keys = set(postings[0]).intersection(*postings[1:])
+        return {key for key in candidate_keys if text in self.product_catalog[key]['_name_lower']}
+
+    def _build_category_index(self):
+        """构建小写类别名到产品键列表的索引
+
+        按类别查询时直接取出该类别的产品键，无需扫描整个目录并逐个比较小写类别名。
+        列表保持目录顺序，使按热度的稳定排序结果与全量扫描一致。
+        """
+        self._category_key_index = defaultdict(list)
+        self._nonzero_popularity_keys = set()
+        for key, details in self.product_catalog.items():
+            self._category_key_index[details['_category_lower']].append(key)
+            if details.get('popularity', 0):
+                self._nonzero_popularity_keys.add(key)
+        self._category_key_index = dict(self._category_key_index)
+        self._category_names_lower = [(name, name.lower()) for name in self.product_categories]
+        self._category_name_re = _compile_keyword_pattern([lower for _, lower in self._category_names_lower])
+        self._category_char_bit_map = {}
+        for _, category_lower in self._category_names_lower:
+            for char in category_lower:
+                self._category_char_bit_map.setdefault(char, 1 << len(self._category_char_bit_map))
+        self._category_char_bits = [(name, _to_bits(category_lower, self._category_char_bit_map))
+                                    for name, category_lower in self._category_names_lower]
+
+    def _top_popular(self, ordered_keys, limit, category_lower=None):
+        """按热度取前 limit 个产品，结果与对 ordered_keys 做稳定降序排序后切片相同
+
+        热度不为0的产品（通常只占少数）单独排序；热度为0的产品保持目录顺序，
+        按需从 ordered_keys 中依次取出，无需对整个列表排序。
+
+        Args:
+            ordered_keys: 按目录顺序排列的候选产品键
+            limit (int): 最大返回数量
+            category_lower (str, optional): 候选产品所属的小写类别，None 表示全部产品
+        """
+        if limit <= 0:
+            return []
+        catalog = self.product_catalog
+        nonzero_keys = self._nonzero_popularity_keys
+        hot_keys = [key for key in nonzero_keys
+                    if category_lower is None or catalog[key]['_category_lower'] == category_lower]
+        hot_keys.sort(key=lambda key: (-catalog[key].get('popularity', 0), self._product_order[key]))
+
+        top_keys = [key for key in hot_keys if catalog[key].get('popularity', 0) > 0][:limit]
+        if len(top_keys) < limit:
+            for key in ordered_keys:
+                if key not in nonzero_keys:
+                    top_keys.append(key)
+                    if len(top_keys) >= limit:
+                        break
+        if len(top_keys) < limit:
+            negative_keys = [key for key in hot_keys if catalog[key].get('popularity', 0) < 0]
+            top_keys.extend(negative_keys[:limit - len(top_keys)])
+        return [(key, catalog[key]) for key in top_keys]
+
+    def _get_source_signature(self, file_path):
+        """获取产品CSV文件签名（绝对路径、修改时间、大小），文件不存在时返回None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def _read_product_columns(self, file_path):
+        """按列读取产品CSV，返回 {小写列名: 该列去除首尾空白后的字符串列表}
+
+        优先用 pandas 的 C 解析器一次性完成分词，并按列批量 strip；pandas 不可用或文件中有
+        字段数多于表头的行（解析报错）时退回 csv.reader，多出的字段被忽略，其余行照常读取。
+        两种方式下，列数不足的行都会以空字符串补齐缺失的字段。
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+
+        if pd is not None:
+            try:
+                # memory_map 让解析器直接读取映射到内存的文件，省去经由Python缓冲读取的拷贝
+                frame = pd.read_csv(file_path, dtype=str, keep_default_na=False,
+                                    encoding='utf-8-sig', skip_blank_lines=True, memory_map=True)
+            except pd.errors.ParserError as e:
+                logger.warning(f"pandas 解析产品CSV失败，改用 csv.reader 逐行读取: {e}")
+            else:
+                columns = {}
+                for name in frame.columns:
+                    columns.setdefault(str(name).strip().lower(), frame[name].str.strip().tolist())
+                return columns
+
+        with open(file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None) or []
+            width = len(header)
+            rows = [row + [""] * (width - len(row)) for row in reader if row]
+        columns = {}
+        for idx, name in enumerate(header):
+            columns.setdefault(name.strip().lower(), [row[idx].strip() for row in rows])
+        return columns
+
+    def _parse_keyword_and_seasonal_columns(self, keywords_column, seasonal_column):
+        """整列解析关键词列表和季节性标记
+
+        pandas 可用时通过 str 访问器对整列做小写、拆分和 isin 判断，否则逐行处理；两种方式结果相同。
+
+        Returns:
+            tuple: (每行小写关键词列表的列表, 每行是否为季节性产品的布尔列表)
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+
+        if pd is not None:
+            split_keywords = pd.Series(keywords_column, dtype=object).str.lower().str.split(r'[;,\s]+', regex=True)
+            keyword_lists = [[k for k in parts if k.strip()] for parts in split_keywords]
+            seasonal_flags = pd.Series(seasonal_column, dtype=object).str.lower().isin(_SEASONAL_TRUE_VALUES).tolist()
+            return keyword_lists, seasonal_flags
+
+        keyword_lists = [[k.lower() for k in re.split(r'[;,\s]+', text) if k.strip()] for text in keywords_column]
+        seasonal_flags = [text.lower() in _SEASONAL_TRUE_VALUES for text in seasonal_column]
+        return keyword_lists, seasonal_flags
+
     def _tokenize(self, text):
         """Tokenize text into alphanumeric words and Chinese characters/bigrams"""
-        text = text.lower()
-        tokens = re.findall(r'[A-Za-z0-9]+', text)
-        for seq in re.findall(r'[\u4e00-\u9fff]+', text):
-            tokens.extend(list(seq))
-            tokens.extend([seq[i:i+2] for i in range(len(seq)-1)])
-        return tokens
+        return _tokenize_cached(text.lower())
 
     def _extract_all_keywords(self):
         """从产品目录中提取所有关键词
@@ -243,23 +524,28 @@ class ProductManager:
         Returns:
             list: 关键词列表
         """
+        # 使用集合做成员判断（O(1)），同时用列表保留首次出现的顺序
         keywords = []
+        seen = set()
         for key, details in self.product_catalog.items():
-            product_name = details['name'].lower()
+            product_name = details['_name_lower']
             
             # 添加完整产品名
-            if product_name not in keywords:
+            if product_name not in seen:
+                seen.add(product_name)
                 keywords.append(product_name)
                 
-            # 添加单个词作为关键词
-            for word in self._tokenize(product_name):
-                if len(word) > 1 and word not in keywords:
+            # 添加单个词作为关键词（名称和关键词在加载时已转为小写，直接走分词缓存）
+            for word in _tokenize_cached(product_name):
+                if len(word) > 1 and word not in seen:
+                    seen.add(word)
                     keywords.append(word)
 
             # 添加自定义关键词
             for kw in details.get('keywords', []):
-                for tok in self._tokenize(kw):
-                    if tok and tok not in keywords:
+                for tok in _tokenize_cached(kw):
+                    if tok and tok not in seen:
+                        seen.add(tok)
                         keywords.append(tok)
                     
         return keywords
@@ -269,7 +555,7 @@ class ProductManager:
         all_words = set()
         for key, details in self.product_catalog.items():
             # 添加产品名称（小写）
-            all_words.add(details['name'].lower())
+            all_words.add(details['_name_lower'])
             # 添加原始显示名称（小写）
             if 'original_display_name' in details:
                 all_words.add(details['original_display_name'].lower())
@@ -376,6 +662,10 @@ class ProductManager:
         if product_key and product_key in self.product_catalog:
             self.product_catalog[product_key]['popularity'] = self.product_catalog[product_key].get('popularity', 0) + increment
             self.popular_products[product_key] = self.popular_products.get(product_key, 0) + increment
+            if self.product_catalog[product_key]['popularity']:
+                self._nonzero_popularity_keys.add(product_key)
+            else:
+                self._nonzero_popularity_keys.discard(product_key)
     
     def get_products_by_category(self, category, limit=5):
         """获取特定类别的产品
@@ -390,14 +680,9 @@ class ProductManager:
         if not category:
             return []
         
-        matching_products = []
-        for key, details in self.product_catalog.items():
-            if details['category'].lower() == category.lower():
-                matching_products.append((key, details))
-                
-        # 按热度排序
-        matching_products.sort(key=lambda x: x[1].get('popularity', 0), reverse=True)
-        return matching_products[:limit]
+        category_lower = category.lower()
+        # 按热度取前 limit 个（与稳定降序排序后切片等价）
+        return self._top_popular(self._category_key_index.get(category_lower, ()), limit, category_lower)
     
     def get_popular_products(self, limit=3, category=None):
         """获取热门产品
@@ -409,16 +694,16 @@ class ProductManager:
         Returns:
             list: 元组 (product_key, product_details) 的列表
         """
-        products = []
-        for key, details in self.product_catalog.items():
-            # 如果指定了类别，只选择该类别
-            if category and details['category'].lower() != category.lower():
-                continue
-            products.append((key, details))
+        # 如果指定了类别，只选择该类别
+        if category:
+            category_lower = category.lower()
+            ordered_keys = self._category_key_index.get(category_lower, ())
+        else:
+            category_lower = None
+            ordered_keys = self.product_catalog
             
-        # 按热度排序
-        products.sort(key=lambda x: x[1].get('popularity', 0), reverse=True)
-        return products[:limit]
+        # 按热度取前 limit 个（与稳定降序排序后切片等价）
+        return self._top_popular(ordered_keys, limit, category_lower)
     
     def get_seasonal_products(self, limit=3, category=None):
         """获取季节性产品
@@ -439,11 +724,12 @@ class ProductManager:
             return products[:limit]
 
         products = []
+        category_lower = category.lower() if category else None
         for key in self.seasonal_products:
             if key in self.product_catalog:
                 details = self.product_catalog[key]
                 # 如果指定了类别，只选择该类别
-                if category and details['category'].lower() != category.lower():
+                if category and details['_category_lower'] != category_lower:
                     continue
                 products.append((key, details))
                 
@@ -451,9 +737,11 @@ class ProductManager:
         if len(products) < limit:
             popular = self.get_popular_products(limit - len(products), category)
             # 确保不重复
+            seen = {key for key, _ in products}
             for key, details in popular:
-                if key not in [p[0] for p in products]:
+                if key not in seen:
                     products.append((key, details))
+                    seen.add(key)
                     
         return products[:limit]
     
@@ -509,85 +797,108 @@ class ProductManager:
         # 使用 normalized_query_text 的长度
         exact_match_bonus = 0.5 if len(normalized_query_text) == 1 else 0.3
         
-        results = []
         # query_text_lower 现在是 normalized_query_text
-        
-        for product_key, product_details in self.product_catalog.items():
-            product_name = product_details.get('name', '')
-            product_original_name = product_details.get('original_display_name', product_name) # 用于日志
-            product_name_lower = product_name.lower()
-            
-            # 计算各种相似度指标，使用 normalized_query_text 和 product_name_lower
-            jaccard_name_score = self._jaccard_similarity(normalized_query_text, product_name_lower)
-            
-            # 关键词匹配
-            product_keywords = product_details.get('keywords', [])
-            # normalized_query_text.split() 可能需要进一步处理，例如过滤空字符串
-            query_tokens = [token for token in normalized_query_text.split() if token]
-            jaccard_kw_score = self._jaccard_similarity_lists(query_tokens, product_keywords)
-            
-            # 字符级别的Jaccard相似度
-            char_jaccard_score = self._character_jaccard_similarity(normalized_query_text, product_name_lower)
-            
-            # Levenshtein编辑距离相似度
-            levenshtein_score = self._levenshtein_similarity(normalized_query_text, product_name_lower)
-            
-            # 拼音相似度
-            pinyin_score = self._pinyin_similarity(normalized_query_text, product_name_lower)
-            
-            # 调试输出
-            # 使用 original_query_for_log 和 product_original_name 进行日志记录，以反映原始输入
-            if "芭乐" in product_original_name and "芭乐" in original_query_for_log:
-                logger.info(f"--- DETAILED DEBUG for '芭乐' MATCH ---")
-                logger.info(f"  Query: '{original_query_for_log}' (Normalized: '{normalized_query_text}') vs Product: '{product_original_name}' (Key: '{product_key}')")
-                logger.info(f"    Raw Jaccard Name: {jaccard_name_score:.4f}")
-                logger.info(f"    Raw Jaccard KW: {jaccard_kw_score:.4f} (Keywords: {product_keywords})")
-                logger.info(f"    Raw Char Jaccard: {char_jaccard_score:.4f}")
-                logger.info(f"    Raw Levenshtein: {levenshtein_score:.4f}")
-                logger.info(f"    Raw Pinyin: {pinyin_score:.4f}")
-                logger.info(f"    Weighted Jaccard Name: {jaccard_name_score * weights['jaccard_name']:.4f}")
-                logger.info(f"    Weighted Jaccard KW: {jaccard_kw_score * weights['jaccard_keywords']:.4f}")
-                logger.info(f"    Weighted Char Jaccard: {char_jaccard_score * weights['char_jaccard']:.4f}")
-                logger.info(f"    Weighted Levenshtein: {levenshtein_score * weights['levenshtein']:.4f}")
-                logger.info(f"    Weighted Pinyin: {pinyin_score * weights['pinyin']:.4f}")
-            else:
-                logger.debug(f"--- Debug Scores for Product KEY: '{product_key}', NAME: '{product_original_name}' vs Query: '{original_query_for_log}' (Normalized: '{normalized_query_text}') ---")
-                logger.debug(f"  Jaccard Name: {jaccard_name_score * weights['jaccard_name']:.4f} (Raw Score: {jaccard_name_score:.4f})")
-                logger.debug(f"  Jaccard KW: {jaccard_kw_score * weights['jaccard_keywords']:.4f} (Raw Score: {jaccard_kw_score:.4f})")
-                logger.debug(f"  Char Jaccard: {char_jaccard_score * weights['char_jaccard']:.4f} (Raw Score: {char_jaccard_score:.4f})")
-                logger.debug(f"  Levenshtein: {levenshtein_score * weights['levenshtein']:.4f} (Raw Score: {levenshtein_score:.4f})")
-                logger.debug(f"  Pinyin: {pinyin_score * weights['pinyin']:.4f} (Raw Score: {pinyin_score:.4f})")
-            
-            # 计算加权得分
-            weighted_scores = [
-                jaccard_name_score * weights['jaccard_name'],
-                jaccard_kw_score * weights['jaccard_keywords'],
-                char_jaccard_score * weights['char_jaccard'],
-                levenshtein_score * weights['levenshtein'],
-                pinyin_score * weights['pinyin']
-            ]
-            
-            # 取最高分
-            max_score = max(weighted_scores) if weighted_scores else 0.0 # Handle empty weighted_scores
-            
-            # 特殊处理：如果查询文本直接包含在产品名称中，给予额外加分
-            exact_match_applied_log = ""
-            if normalized_query_text and normalized_query_text in product_name_lower: # 使用 normalized_query_text
-                max_score += exact_match_bonus
-                max_score = min(max_score, 1.0)  # 确保分数不超过1
-                exact_match_applied_log = f" (Exact match bonus {exact_match_bonus} applied, new score: {max_score:.4f})"
-            
-            if "芭乐" in product_original_name and "芭乐" in original_query_for_log:
-                logger.info(f"    Max Score from components: {max_score:.4f}{exact_match_applied_log}")
-                logger.info(f"    Final Overall Similarity for KEY: '{product_key}': {max_score:.4f} (Threshold: {threshold})")
 
-            if max_score >= threshold:
-                results.append((product_key, max_score))
-            
-            if not ("芭乐" in product_original_name and "芭乐" in original_query_for_log):
-                logger.debug(f"  Max Score from components: {max_score:.4f}{exact_match_applied_log}")
-                logger.debug(f"  Final Overall Similarity for KEY: '{product_key}': {max_score:.4f} (Threshold: {threshold})")
-                
+        # 查询侧的集合只需计算一次
+        query_chars = frozenset(normalized_query_text)
+        # normalized_query_text.split() 可能需要进一步处理，例如过滤空字符串
+        query_token_set = frozenset(token for token in normalized_query_text.split() if token)
+        # 查询侧位图：目录中没有的字符/词不占比特位，只计入集合大小（并集）
+        query_char_bits = _to_bits(query_chars, self._char_bits)
+        query_token_bits = _to_bits(query_token_set, self._keyword_bits)
+        # 查询的拼音每次调用只转换一次，产品名称的拼音已在 _build_match_index 中预先计算
+        query_pinyin = _pinyin_text(normalized_query_text)
+        # 名称直接包含查询文本的产品（用于包含加分和单字查询排序）
+        containing_keys = self._keys_with_name_containing(normalized_query_text)
+
+        # 逐产品的调试日志开销较大，仅在对应日志级别启用时才构建
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        trace_guava = info_enabled and "芭乐" in original_query_for_log
+
+        # 与查询没有任何共同字符的产品，名称Jaccard、字符Jaccard、编辑距离得分均为0，
+        # 也不会获得包含加分，最高分只能来自关键词或拼音；当阈值高于该上限时，
+        # 只需对与查询共享字符的产品（由字符倒排索引给出）打分。
+        no_overlap_ceiling = max(weights['jaccard_keywords'], weights['pinyin'])
+        if threshold > no_overlap_ceiling:
+            candidates = [(key, self.product_catalog[key])
+                          for key in self._keys_sharing_chars(query_chars)]
+        else:
+            candidates = list(self.product_catalog.items())
+
+        # 各项得分按候选批量计算为数组，加权取最大、包含加分和阈值过滤都是整批的向量运算
+        count = len(candidates)
+        candidate_features = [self._match_features[key] for key, _ in candidates]
+        # 名称Jaccard与字符级Jaccard均基于字符集合，结果相同，只计算一次
+        jaccard_name_scores = np.fromiter(
+            (_bit_jaccard(query_char_bits, len(query_chars), features['name_bits'], features['name_char_count'])
+             for features in candidate_features), dtype=np.float64, count=count)
+        char_jaccard_scores = jaccard_name_scores
+        jaccard_kw_scores = np.fromiter(
+            (_bit_jaccard(query_token_bits, len(query_token_set), features['keyword_bits'], features['keyword_count'])
+             for features in candidate_features), dtype=np.float64, count=count)
+        # 编辑距离和拼音相似度
+        levenshtein_scores = np.asarray(self._batch_levenshtein_similarity(
+            normalized_query_text, [details['_name_lower'] for _, details in candidates]), dtype=np.float64)
+        pinyin_scores = np.asarray(self._batch_levenshtein_similarity(
+            query_pinyin, [features['name_pinyin'] for features in candidate_features]), dtype=np.float64)
+
+        # 取加权后的最高分
+        max_scores = np.maximum.reduce([
+            jaccard_name_scores * weights['jaccard_name'],
+            jaccard_kw_scores * weights['jaccard_keywords'],
+            char_jaccard_scores * weights['char_jaccard'],
+            levenshtein_scores * weights['levenshtein'],
+            pinyin_scores * weights['pinyin']
+        ])
+
+        # 特殊处理：如果查询文本直接包含在产品名称中，给予额外加分（分数不超过1）
+        bonus_mask = np.fromiter((key in containing_keys for key, _ in candidates), dtype=bool, count=count)
+        max_scores = np.where(bonus_mask, np.minimum(max_scores + exact_match_bonus, 1.0), max_scores)
+
+        results = [(candidates[idx][0], float(max_scores[idx])) for idx in np.flatnonzero(max_scores >= threshold)]
+
+        # 调试输出
+        # 使用 original_query_for_log 和 product_original_name 进行日志记录，以反映原始输入
+        if trace_guava or debug_enabled:
+            for idx, (product_key, product_details) in enumerate(candidates):
+                product_original_name = product_details.get('original_display_name', product_details.get('name', ''))
+                jaccard_name_score = jaccard_name_scores[idx]
+                jaccard_kw_score = jaccard_kw_scores[idx]
+                char_jaccard_score = char_jaccard_scores[idx]
+                levenshtein_score = levenshtein_scores[idx]
+                pinyin_score = pinyin_scores[idx]
+                max_score = max_scores[idx]
+                exact_match_applied_log = ""
+                if bonus_mask[idx]:
+                    exact_match_applied_log = f" (Exact match bonus {exact_match_bonus} applied, new score: {max_score:.4f})"
+
+                is_guava_trace = trace_guava and "芭乐" in product_original_name
+                if is_guava_trace:
+                    logger.info(f"--- DETAILED DEBUG for '芭乐' MATCH ---")
+                    logger.info(f"  Query: '{original_query_for_log}' (Normalized: '{normalized_query_text}') vs Product: '{product_original_name}' (Key: '{product_key}')")
+                    logger.info(f"    Raw Jaccard Name: {jaccard_name_score:.4f}")
+                    logger.info(f"    Raw Jaccard KW: {jaccard_kw_score:.4f} (Keywords: {product_details.get('keywords', [])})")
+                    logger.info(f"    Raw Char Jaccard: {char_jaccard_score:.4f}")
+                    logger.info(f"    Raw Levenshtein: {levenshtein_score:.4f}")
+                    logger.info(f"    Raw Pinyin: {pinyin_score:.4f}")
+                    logger.info(f"    Weighted Jaccard Name: {jaccard_name_score * weights['jaccard_name']:.4f}")
+                    logger.info(f"    Weighted Jaccard KW: {jaccard_kw_score * weights['jaccard_keywords']:.4f}")
+                    logger.info(f"    Weighted Char Jaccard: {char_jaccard_score * weights['char_jaccard']:.4f}")
+                    logger.info(f"    Weighted Levenshtein: {levenshtein_score * weights['levenshtein']:.4f}")
+                    logger.info(f"    Weighted Pinyin: {pinyin_score * weights['pinyin']:.4f}")
+                    logger.info(f"    Max Score from components: {max_score:.4f}{exact_match_applied_log}")
+                    logger.info(f"    Final Overall Similarity for KEY: '{product_key}': {max_score:.4f} (Threshold: {threshold})")
+                elif debug_enabled:
+                    logger.debug(f"--- Debug Scores for Product KEY: '{product_key}', NAME: '{product_original_name}' vs Query: '{original_query_for_log}' (Normalized: '{normalized_query_text}') ---")
+                    logger.debug(f"  Jaccard Name: {jaccard_name_score * weights['jaccard_name']:.4f} (Raw Score: {jaccard_name_score:.4f})")
+                    logger.debug(f"  Jaccard KW: {jaccard_kw_score * weights['jaccard_keywords']:.4f} (Raw Score: {jaccard_kw_score:.4f})")
+                    logger.debug(f"  Char Jaccard: {char_jaccard_score * weights['char_jaccard']:.4f} (Raw Score: {char_jaccard_score:.4f})")
+                    logger.debug(f"  Levenshtein: {levenshtein_score * weights['levenshtein']:.4f} (Raw Score: {levenshtein_score:.4f})")
+                    logger.debug(f"  Pinyin: {pinyin_score * weights['pinyin']:.4f} (Raw Score: {pinyin_score:.4f})")
+                    logger.debug(f"  Max Score from components: {max_score:.4f}{exact_match_applied_log}")
+                    logger.debug(f"  Final Overall Similarity for KEY: '{product_key}': {max_score:.4f} (Threshold: {threshold})")
+
         # 按相似度降序排序
         results.sort(key=lambda x: x[1], reverse=True)
         
@@ -595,15 +906,17 @@ class ProductManager:
         if len(normalized_query_text) == 1: # 使用 normalized_query_text
             # 对于单字查询，将直接包含该字的产品排在前面
             # 确保比较时产品名称也是小写
-            exact_matches = [(k, s) for k, s in results if normalized_query_text in self.product_catalog[k].get('name', '').lower()]
-            other_matches = [(k, s) for k, s in results if normalized_query_text not in self.product_catalog[k].get('name', '').lower()]
+            exact_matches = [(k, s) for k, s in results if k in containing_keys]
+            other_matches = [(k, s) for k, s in results if k not in containing_keys]
             results = exact_matches + other_matches
         
-        for key, score in results:
-            logger.debug(f"找到匹配产品: {self.product_catalog[key].get('name', key)}, 得分: {score}")
+        if debug_enabled:
+            for key, score in results:
+                logger.debug(f"找到匹配产品: {self.product_catalog[key].get('name', key)}, 得分: {score}")
             
         # 日志中使用原始查询文本
-        logger.info(f"fuzzy_match_product: 为查询 '{original_query_for_log}' (Normalized: '{normalized_query_text}') 找到 {len(results)} 个相似产品")
+        logger.info("fuzzy_match_product: 为查询 '%s' (Normalized: '%s') 找到 %d 个相似产品",
+                    original_query_for_log, normalized_query_text, len(results))
         return results
     
     def find_related_category(self, query_text):
@@ -621,32 +934,41 @@ class ProductManager:
         query_lower = query_text.lower()
         
         # 0. 首先尝试直接匹配产品名，如果找到产品，直接返回其类别
-        for key, details in self.product_catalog.items():
-            product_name = details['name'].lower()
-            if product_name in query_lower or query_lower in product_name:
-                logger.debug(f"通过产品名匹配识别到类别: {details['category']} (产品: {product_name})")
-                return details['category']
+        # 名称出现在查询中的产品由名称trie一次扫描得出，包含查询的产品由字符倒排索引求交集得出；
+        # 取目录中最靠前的一个，与逐个扫描的结果一致
+        matched_keys = self._keys_with_name_in(query_lower)
+        matched_keys.update(self._keys_with_name_containing(query_lower))
+        if matched_keys:
+            details = self.product_catalog[min(matched_keys, key=self._product_order.__getitem__)]
+            logger.debug(f"通过产品名匹配识别到类别: {details['category']} (产品: {details['_name_lower']})")
+            return details['category']
 
         # 1. 检查水果和蔬菜特定关键词
-        for keyword in config.FRUIT_KEYWORDS:
-            if keyword in query_lower:
-                logger.debug(f"通过水果关键词识别到产品类别: 时令水果 (关键词: {keyword})")
-                return "时令水果"
+        fruit_match = self._fruit_keyword_re.search(query_lower) if self._fruit_keyword_re else None
+        if fruit_match:
+            logger.debug(f"通过水果关键词识别到产品类别: 时令水果 (关键词: {fruit_match.group(0)})")
+            return "时令水果"
 
-        for keyword in config.VEGETABLE_KEYWORDS:
-            if keyword in query_lower:
-                logger.debug(f"通过蔬菜关键词识别到产品类别: 新鲜蔬菜 (关键词: {keyword})")
-                return "新鲜蔬菜"
+        vegetable_match = self._vegetable_keyword_re.search(query_lower) if self._vegetable_keyword_re else None
+        if vegetable_match:
+            logger.debug(f"通过蔬菜关键词识别到产品类别: 新鲜蔬菜 (关键词: {vegetable_match.group(0)})")
+            return "新鲜蔬菜"
 
         # 2. 直接在查询中查找类别名称
-        for category_name in self.product_categories.keys():
-            if category_name.lower() in query_lower:
-                logger.debug(f"通过类别名直接匹配: {category_name}")
-                return category_name
+        # 先用预编译正则一次扫描判断是否含有任一类别名，命中时再按类别顺序确定返回哪一个
+        if self._category_name_re and self._category_name_re.search(query_lower):
+            for category_name, category_lower in self._category_names_lower:
+                if category_lower in query_lower:
+                    logger.debug(f"通过类别名直接匹配: {category_name}")
+                    return category_name
 
         # 3. 检查类别关键词映射
         category_scores = {}
         for cat, keywords_list in config.CATEGORY_KEYWORD_MAP.items():
+            # 先用预编译正则快速排除不含任何关键词的类别，仅对命中的类别逐个计数
+            category_re = self._category_keyword_res.get(cat)
+            if not category_re or not category_re.search(query_lower):
+                continue
             score = 0
             matched_keywords = []
             for keyword in keywords_list:
@@ -673,19 +995,19 @@ class ProductManager:
             return category
 
         # 5. 基于通用词汇进行猜测
-        if any(word in query_lower for word in ["吃", "食", "鲜", "甜", "新鲜", "水果", "果"]):
+        if _GENERIC_FRUIT_WORDS_RE.search(query_lower):
             logger.debug(f"通过通用词汇猜测类别: 时令水果")
             return "时令水果"
-        if any(word in query_lower for word in ["菜", "素", "绿色", "蔬菜", "青菜"]):
+        if _GENERIC_VEGETABLE_WORDS_RE.search(query_lower):
             logger.debug(f"通过通用词汇猜测类别: 新鲜蔬菜")
             return "新鲜蔬菜"
 
         # 6. 分析查询中的字符，检查与类别名称的重叠
-        query_chars = set(query_lower)
+        # 查询字符位图只算一次，与每个类别名位图求与后用 popcount 得到重叠字符数
+        query_bits = _to_bits(query_lower, self._category_char_bit_map)
         category_char_scores = {}
-        for category_name in self.product_categories.keys():
-            category_chars = set(category_name.lower())
-            overlap = len(query_chars.intersection(category_chars))
+        for category_name, category_bits in self._category_char_bits:
+            overlap = _popcount(query_bits & category_bits)
             if overlap > 0:
                 category_char_scores[category_name] = overlap
         
@@ -730,23 +1052,7 @@ class ProductManager:
         Returns:
             int: 转换后的整数，如未找到匹配则默认为1
         """
-        num_map = {'零': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
-                  '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
-        text = text.strip()
-
-        # 直接匹配单个数字
-        if text in num_map:
-            return num_map[text]
-
-        # 处理十到九十九
-        match = re.fullmatch(r'([一二两三四五六七八九])?十([一二三四五六七八九])?', text)
-        if match:
-            tens_char, ones_char = match.groups()
-            tens = num_map.get(tens_char, 1)
-            ones = num_map.get(ones_char, 0)
-            return tens * 10 + ones
-
-        return 1
+        return _CN_NUMBER_TABLE.get(text.strip(), 1)
 
     def find_similar_products(self, query_string: str, threshold: float = 0.3):
         """
@@ -774,12 +1080,14 @@ class ProductManager:
         matched_products_with_scores.sort(key=lambda x: x[1], reverse=True)
         
         # 转换为期望的返回格式
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         for product_key, score in matched_products_with_scores:
             if product_key in self.product_catalog:
                 similar_products.append((product_key, self.product_catalog[product_key]))
-                logger.debug(f"找到匹配产品: {product_key}, 得分: {score}")
+                if debug_enabled:
+                    logger.debug(f"找到匹配产品: {product_key}, 得分: {score}")
 
-        logger.info(f"find_similar_products: 为查询 '{query_string}' 找到 {len(similar_products)} 个相似产品")
+        logger.info("find_similar_products: 为查询 '%s' 找到 %d 个相似产品", query_string, len(similar_products))
         return similar_products
 
     def get_product_categories(self):
@@ -873,13 +1181,21 @@ class ProductManager:
             return 0.0
         return Levenshtein.ratio(str1, str2)
 
+    def _batch_levenshtein_similarity(self, query: str, choices: List[str]):
+        """
+        计算 query 与每个候选字符串的相似度，结果与逐个调用 _levenshtein_similarity 相同。
+        rapidfuzz 可用时用 process.cdist 在C层一次算完整批候选。
+        """
+        if _cdist is None or not choices:
+            return [self._levenshtein_similarity(query, choice) for choice in choices]
+        return _cdist([query], choices, scorer=_indel_similarity, dtype=np.float64)[0]
+
     def _pinyin_similarity(self, str1: str, str2: str) -> float:
         """计算两个字符串的拼音相似度"""
         try:
-            from pypinyin import lazy_pinyin
             # 转换为拼音
-            pinyin1 = ' '.join(lazy_pinyin(str1))
-            pinyin2 = ' '.join(lazy_pinyin(str2))
+            pinyin1 = _pinyin_text(str1)
+            pinyin2 = _pinyin_text(str2)
             
             # 计算拼音的Levenshtein相似度
             return self._levenshtein_similarity(pinyin1, pinyin2)
@@ -183,7 +183,7 @@ class ProductRecommendationEngine:
                 # 避免重复推荐
                 if not any(rec.product_key == product_key for rec in recommendations):
                     # 如果指定了类别，优先选择该类别的产品
-                    if target_category and product_details.get('category', '').lower() != target_category.lower():
+                    if target_category and product_details.get('_category_lower', '') != target_category.lower():
                         continue
 
                     recommendations.append(ProductRecommendation(
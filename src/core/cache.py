@@ -1,6 +1,7 @@
 import os
 import time
 import json
+import pickle
 import hashlib
 import logging
 from functools import wraps
@@ -10,6 +11,9 @@ from typing import Optional, Any
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 产品缓存格式版本，缓存结构变化时递增以使旧快照失效
+PRODUCT_CACHE_VERSION = 2
+
 class CacheManager:
     """缓存管理器，提供多种缓存机制，支持Redis分布式缓存"""
 
@@ -24,7 +28,7 @@ class CacheManager:
         self.cache_dir = cache_dir
         self.memory_cache = {}
         self.ensure_cache_dir()
-        self.product_cache_file = os.path.join(cache_dir, "product_cache.json")
+        self.product_cache_file = os.path.join(cache_dir, "product_cache.pkl")
         self.llm_cache_file = os.path.join(cache_dir, "llm_responses.json")
         self.session_cache = {}  # 内存中的会话缓存 {user_id: {context_data}}
         self.ttl_cache = {}  # 带过期时间的缓存 {key: (value, expiry_time)}
@@ -58,43 +62,69 @@ class CacheManager:
     
     # ----- 产品数据缓存 ----- #
     
-    def cache_product_data(self, product_catalog, product_categories, seasonal_products):
-        """缓存产品数据到文件
-        
+    def cache_product_data(self, product_catalog, product_categories, seasonal_products,
+                           source_signature=None, extra_data=None):
+        """缓存产品数据到pickle快照文件
+
         Args:
             product_catalog (dict): 产品目录
             product_categories (dict): 产品分类
             seasonal_products (list): 当季产品列表
+            source_signature (tuple, optional): 源CSV文件签名（路径、修改时间、大小），
+                                                用于在源文件变化时使缓存失效
+            extra_data (dict, optional): 由产品目录派生的附加数据（如关键词列表）
         """
+        tmp_file = None
         try:
             cache_data = {
+                "version": PRODUCT_CACHE_VERSION,
                 "timestamp": time.time(),
+                "source_signature": source_signature,
                 "product_catalog": product_catalog,
                 "product_categories": product_categories,
-                "seasonal_products": seasonal_products
+                "seasonal_products": seasonal_products,
+                "extra_data": extra_data or {}
             }
-            with open(self.product_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            # 先写临时文件再替换，避免并发启动的进程读到写了一半的快照
+            tmp_file = f"{self.product_cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.product_cache_file)
             logger.info(f"产品数据已缓存至: {self.product_cache_file}")
         except Exception as e:
             logger.error(f"缓存产品数据失败: {e}")
+            # 写入或替换失败时删除残留的临时文件
+            if tmp_file is not None:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
     
-    def get_cached_product_data(self, max_age_hours=24):
+    def get_cached_product_data(self, max_age_hours=24, source_signature=None):
         """从缓存加载产品数据
         
         Args:
             max_age_hours (int): 缓存最大有效期（小时）
+            source_signature (tuple, optional): 当前源CSV文件签名，与缓存中记录的不一致时视为未命中
             
         Returns:
-            tuple: (product_catalog, product_categories, seasonal_products) 或 
-                   None（如果缓存不存在或已过期）
+            tuple: (product_catalog, product_categories, seasonal_products, extra_data) 或 
+                   None（如果缓存不存在、已过期或源文件已变化）
         """
         if not os.path.exists(self.product_cache_file):
             return None
         
         try:
-            with open(self.product_cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            with open(self.product_cache_file, 'rb') as f:
+                cache_data = pickle.load(f)
+
+            if cache_data.get("version") != PRODUCT_CACHE_VERSION:
+                logger.info("产品数据缓存版本不匹配，将重新加载")
+                return None
+
+            if source_signature is not None and cache_data.get("source_signature") != source_signature:
+                logger.info("产品数据源文件已变化，缓存失效")
+                return None
             
             # 检查缓存是否过期
             cache_age_hours = (time.time() - cache_data["timestamp"]) / 3600
@@ -106,7 +136,8 @@ class CacheManager:
             return (
                 cache_data["product_catalog"],
                 cache_data["product_categories"],
-                cache_data["seasonal_products"]
+                cache_data["seasonal_products"],
+                cache_data["extra_data"]
             )
         except Exception as e:
             logger.error(f"加载产品数据缓存失败: {e}")
@@ -132,6 +132,17 @@ def test_intent_classifier():
     
     return accuracy >= 0.7
 
+def test_predict_batch_matches_predict():
+    """批量预测结果应与逐条预测保持一致且顺序不变"""
+    classifier = IntentClassifier()
+    texts = ["你好", "苹果多少钱", "退货政策", "你是谁"]
+
+    batch_results = classifier.predict_batch(texts)
+
+    assert len(batch_results) == len(texts)
+    assert batch_results == [classifier.predict(text) for text in texts]
+    assert classifier.predict_batch([]) == []
+
 if __name__ == "__main__":
     success = test_intent_classifier()
     if not success:
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+轻量级组件批量接口测试
+验证批量预测/批量搜索与逐条调用的结果一致
+"""
+
+import sys
+import os
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.app.intent.lightweight_classifier import LightweightIntentClassifier
+from src.app.policy.lightweight_manager import LightweightPolicyManager
+
+# 覆盖规则命中、规则未命中以及空查询的情况
+TEST_QUERIES = [
+    "你好",
+    "苹果多少钱",
+    "有没有香蕉",
+    "怎么付款",
+    "推荐点什么",
+    "你是谁",
+    "配送费用",
+    "退款政策",
+    "取货地址",
+    "质量问题",
+    "周几送货",
+    "会员",
+    "xyz abc",
+    "",
+    "   ",
+]
+
+def test_predict_batch_matches_predict():
+    """批量意图预测与逐条预测结果一致"""
+    classifier = LightweightIntentClassifier()
+
+    expected = [classifier.predict(query) for query in TEST_QUERIES]
+    assert classifier.predict_batch(TEST_QUERIES) == expected
+    assert classifier.predict_batch([]) == []
+
+def test_search_policy_batch_matches_search_policy():
+    """批量政策搜索与逐条搜索结果一致"""
+    manager = LightweightPolicyManager()
+
+    expected = [manager.search_policy(query, top_k=2) for query in TEST_QUERIES]
+    assert manager.search_policy_batch(TEST_QUERIES, top_k=2) == expected
+    assert manager.search_policy_batch([]) == []
+
+if __name__ == "__main__":
+    test_predict_batch_matches_predict()
+    test_search_policy_batch_matches_search_policy()
+    print("[OK] 批量接口与逐条调用结果一致")
@@ -87,6 +87,77 @@ def test_fuzzy_matching():
         traceback.print_exc()
         return False
 
+def test_product_cache_invalidation():
+    """测试产品缓存在CSV文件变化后自动失效"""
+    import shutil
+    import tempfile
+    from src.core.cache import CacheManager
+
+    print("\n测试产品缓存失效:")
+    print("=" * 50)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(tmp_dir, 'products.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("ProductName,Specification,Price,Unit,Category\n")
+            f.write("测试苹果,斤,1.99,斤,时令水果\n")
+
+        cache_manager = CacheManager(cache_dir=os.path.join(tmp_dir, 'cache'), enable_redis=False)
+        pm = ProductManager(cache_manager=cache_manager)
+        assert pm.load_product_data(csv_path)
+        assert len(pm.product_catalog) == 1
+
+        # 同一文件再次加载应命中缓存
+        assert cache_manager.get_cached_product_data(source_signature=pm._get_source_signature(csv_path))
+
+        # 命中缓存时匹配索引随快照恢复，匹配结果与从CSV构建时一致
+        cached_pm = ProductManager(cache_manager=cache_manager)
+        assert cached_pm.load_product_data(csv_path)
+        assert cached_pm._match_features.keys() == pm._match_features.keys()
+        assert cached_pm.fuzzy_match_product("苹果") == pm.fuzzy_match_product("苹果")
+
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write("测试香蕉,磅,0.99,磅,时令水果\n")
+
+        assert pm.load_product_data(csv_path)
+        print(f"修改后产品数量: {len(pm.product_catalog)}")
+        assert len(pm.product_catalog) == 2
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_product_loading_with_extra_field_row():
+    """测试CSV中某一行多出字段时，该行按前几列加载（多出的字段被忽略），其余产品正常加载"""
+    import shutil
+    import tempfile
+    from src.core.cache import CacheManager
+
+    print("\n测试含多余字段行的CSV加载:")
+    print("=" * 50)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(tmp_dir, 'products.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("ProductName,Specification,Price,Unit,Category\n")
+            f.write("测试苹果,斤,1.99,斤,时令水果\n")
+            f.write("测试香蕉,磅,0.99,磅,时令水果,多余字段\n")
+            f.write("测试草莓,盒,5.99,盒,时令水果\n")
+
+        cache_manager = CacheManager(cache_dir=os.path.join(tmp_dir, 'cache'), enable_redis=False)
+        pm = ProductManager(cache_manager=cache_manager)
+        assert pm.load_product_data(csv_path)
+        print(f"加载的产品: {sorted(pm.product_catalog)}")
+        assert set(pm.product_catalog) == {"测试苹果", "测试香蕉", "测试草莓"}
+
+        banana = pm.product_catalog["测试香蕉"]
+        assert banana['specification'] == "磅"
+        assert banana['price'] == 0.99
+        assert banana['unit'] == "磅"
+        assert banana['category'] == "时令水果"
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
 if __name__ == "__main__":
     success1 = test_product_loading()
     success2 = test_fuzzy_matching()